@@ -0,0 +1,57 @@
+"""products fts5 search index
+
+Revision ID: 261a01cfb03c
+Revises: 6b0d40428a03
+Create Date: 2026-10-18 11:02:47.503918
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '261a01cfb03c'
+down_revision: Union[str, None] = '6b0d40428a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # external-content FTS5 index over products, kept in sync by triggers
+    op.execute("""
+        CREATE VIRTUAL TABLE products_fts USING fts5(
+            name, description, category,
+            content='products', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts(rowid, name, description, category)
+            VALUES (new.id, new.name, new.description, new.category);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description, category)
+            VALUES ('delete', old.id, old.name, old.description, old.category);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_au AFTER UPDATE OF name, description, category ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description, category)
+            VALUES ('delete', old.id, old.name, old.description, old.category);
+            INSERT INTO products_fts(rowid, name, description, category)
+            VALUES (new.id, new.name, new.description, new.category);
+        END
+    """)
+    op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+    op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,37 @@
+"""drop password reset tokens
+
+Revision ID: 5640cc31484e
+Revises: 8693035ece8f
+Create Date: 2026-10-18 17:21:09.730416
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5640cc31484e'
+down_revision: Union[str, None] = '8693035ece8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # reset links are signed tokens now; nothing reads or writes this table any more
+    op.drop_index(op.f('ix_password_reset_tokens_expiration_time'), table_name='password_reset_tokens')
+    op.drop_table('password_reset_tokens')
+
+
+def downgrade() -> None:
+    op.create_table('password_reset_tokens',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=255), nullable=False),
+    sa.Column('expiration_time', sa.DateTime(), nullable=False),
+    sa.Column('used', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token')
+    )
+    op.create_index(op.f('ix_password_reset_tokens_expiration_time'), 'password_reset_tokens', ['expiration_time'], unique=False)
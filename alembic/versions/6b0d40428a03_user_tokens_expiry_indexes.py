@@ -0,0 +1,29 @@
+"""user tokens expiry indexes
+
+Revision ID: 6b0d40428a03
+Revises: 728cdf3b1f68
+Create Date: 2026-10-18 10:12:04.118532
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b0d40428a03'
+down_revision: Union[str, None] = '728cdf3b1f68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_tokens_user_id_expires_at', 'user_tokens', ['user_id', 'expires_at'], unique=False)
+    op.create_index(op.f('ix_user_tokens_expires_at'), 'user_tokens', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_password_reset_tokens_expiration_time'), 'password_reset_tokens', ['expiration_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_password_reset_tokens_expiration_time'), table_name='password_reset_tokens')
+    op.drop_index(op.f('ix_user_tokens_expires_at'), table_name='user_tokens')
+    op.drop_index('ix_user_tokens_user_id_expires_at', table_name='user_tokens')
@@ -0,0 +1,47 @@
+"""row versions and catalog state
+
+Revision ID: 8067440c6878
+Revises: b4468fb35d29
+Create Date: 2026-10-18 12:31:40.871205
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8067440c6878'
+down_revision: Union[str, None] = 'b4468fb35d29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('products', 'cart', 'orders'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.create_table('catalog_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO catalog_state (id, version, updated_at) VALUES (1, 0, CURRENT_TIMESTAMP)")
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        op.execute(f"""
+            CREATE TRIGGER catalog_state_{event.lower()} AFTER {event} ON products BEGIN
+                UPDATE catalog_state SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+            END
+        """)
+
+
+def downgrade() -> None:
+    for event in ('insert', 'update', 'delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS catalog_state_{event}")
+    op.drop_table('catalog_state')
+    for table in ('orders', 'cart', 'products'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
+            batch_op.drop_column('version')
@@ -0,0 +1,29 @@
+"""order item product snapshot
+
+Revision ID: 8693035ece8f
+Revises: d82534def003
+Create Date: 2026-10-18 17:05:32.518204
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8693035ece8f'
+down_revision: Union[str, None] = 'd82534def003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # OrderItem has declared these since the initial schema, but no migration created them
+    op.add_column('order_items', sa.Column('product_name', sa.String(), nullable=True))
+    op.add_column('order_items', sa.Column('product_description', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_column('product_description')
+        batch_op.drop_column('product_name')
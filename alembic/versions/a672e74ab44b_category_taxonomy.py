@@ -0,0 +1,110 @@
+"""category taxonomy
+
+Revision ID: a672e74ab44b
+Revises: 8067440c6878
+Create Date: 2026-10-18 15:02:11.408213
+
+"""
+import re
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a672e74ab44b'
+down_revision: Union[str, None] = '8067440c6878'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _slugify(name: str) -> str:
+    # frozen copy of app.product.categories.slugify
+    slug = "-".join(re.findall(r"[a-z0-9]+", name.lower()))
+    return slug or name.strip().lower()
+
+
+def upgrade() -> None:
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('slug', sa.String(length=60), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['parent_id'], ['categories.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
+    op.create_index(op.f('ix_categories_slug'), 'categories', ['slug'], unique=True)
+    op.create_table('category_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_category_closure_descendant_id', 'category_closure', ['descendant_id'], unique=False)
+
+    # plain ADD COLUMN keeps the products table (and its FTS / catalog_state triggers) in place
+    op.execute("ALTER TABLE products ADD COLUMN category_id INTEGER REFERENCES categories (id) ON DELETE SET NULL")
+    op.create_index('ix_products_category_id_id', 'products', ['category_id', 'id'], unique=False)
+
+    # backfill: one top-level category per distinct slug of the free-text values
+    bind = op.get_bind()
+    slugs = {}
+    for (name,) in bind.execute(sa.text("SELECT DISTINCT category FROM products WHERE category IS NOT NULL")):
+        slugs.setdefault(_slugify(name), []).append(name)
+    for slug, names in slugs.items():
+        category_id = bind.execute(
+            sa.text("INSERT INTO categories (slug, name) VALUES (:slug, :name) RETURNING id"),
+            {"slug": slug, "name": names[0].strip()},
+        ).scalar_one()
+        bind.execute(
+            sa.text("INSERT INTO category_closure (ancestor_id, descendant_id, depth) VALUES (:id, :id, 0)"),
+            {"id": category_id},
+        )
+        bind.execute(
+            sa.text("UPDATE products SET category_id = :id WHERE category IN :names").bindparams(
+                sa.bindparam("names", expanding=True)
+            ),
+            {"id": category_id, "names": names},
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_category_id_id', table_name='products')
+    # SQLite cannot DROP a column that carries a foreign key, so the table is rebuilt;
+    # that drops its triggers, which are recreated below
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('category_id')
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS catalog_state_{event.lower()} AFTER {event} ON products BEGIN
+                UPDATE catalog_state SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;
+            END
+        """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts(rowid, name, description, category)
+            VALUES (new.id, new.name, new.description, new.category);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description, category)
+            VALUES ('delete', old.id, old.name, old.description, old.category);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description, category ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description, category)
+            VALUES ('delete', old.id, old.name, old.description, old.category);
+            INSERT INTO products_fts(rowid, name, description, category)
+            VALUES (new.id, new.name, new.description, new.category);
+        END
+    """)
+    op.drop_index('ix_category_closure_descendant_id', table_name='category_closure')
+    op.drop_table('category_closure')
+    op.drop_index(op.f('ix_categories_slug'), table_name='categories')
+    op.drop_index(op.f('ix_categories_id'), table_name='categories')
+    op.drop_table('categories')
@@ -0,0 +1,29 @@
+"""keyset pagination indexes
+
+Revision ID: b4468fb35d29
+Revises: 261a01cfb03c
+Create Date: 2026-10-18 11:48:15.220671
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4468fb35d29'
+down_revision: Union[str, None] = '261a01cfb03c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_price_id', 'products', ['price', 'id'], unique=False)
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('ix_orders_user_id_id', 'orders', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_user_id_id', table_name='orders')
+    op.drop_index('ix_products_name_id', table_name='products')
+    op.drop_index('ix_products_price_id', table_name='products')
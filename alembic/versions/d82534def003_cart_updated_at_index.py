@@ -0,0 +1,27 @@
+"""cart updated_at index
+
+Revision ID: d82534def003
+Revises: a672e74ab44b
+Create Date: 2026-10-18 16:20:47.193508
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd82534def003'
+down_revision: Union[str, None] = 'a672e74ab44b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # lines written before updated_at existed start their TTL now instead of expiring on the first sweep
+    op.execute("UPDATE cart SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+    op.create_index('ix_cart_updated_at', 'cart', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cart_updated_at', table_name='cart')
@@ -1,19 +1,17 @@
 from fastapi import BackgroundTasks
 from app.core.settings import get_settings
-from app.auth.models import User, PasswordResetToken
+from app.auth.models import User
 from app.core.email import send_email
 from app.auth.utils.email_context import FORGOT_PASSWORD, USER_VERIFY_ACCOUNT
-import secrets
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from datetime import timedelta
 
 settings = get_settings()
 
 
 async def send_account_verification_email(user: User, background_tasks: BackgroundTasks):
-    from app.core.security import hash_password
+    from app.core.security import generate_signed_token
     string_context = user.get_context_string(context=USER_VERIFY_ACCOUNT)
-    token = hash_password(string_context)
+    token = generate_signed_token(user.id, string_context, timedelta(minutes=settings.VERIFY_TOKEN_EXPIRE_MINUTES))
     activate_url = f"{settings.FRONTEND_HOST}/auth/account-verify?token={token}&email={user.email}"
     data = {
         'app_name': settings.APP_NAME,
@@ -47,27 +45,16 @@ async def send_account_activation_confirmation_email(user: User, background_task
         #use_real_smtp=True
     )
     
-async def send_password_reset_email(user: User, background_tasks: BackgroundTasks, session: Session):
-    # 1. Generate a secure token
-    token = secrets.token_urlsafe(32)
+async def send_password_reset_email(user: User, background_tasks: BackgroundTasks):
+    from app.core.security import generate_signed_token
+    # 1. Generate a signed one-time token (invalidated once the password/updated_at change)
+    string_context = user.get_context_string(context=FORGOT_PASSWORD)
+    token = generate_signed_token(user.id, string_context, timedelta(minutes=settings.RESET_TOKEN_EXPIRE_MINUTES))
 
-    # 2. Store it in the database
-    expiration_time = datetime.utcnow() + timedelta(minutes=15)
-
-    reset_token = PasswordResetToken(
-        user_id=user.id,
-        token=token,
-        expiration_time=expiration_time,
-        used=False
-    )
-
-    session.add(reset_token)
-    session.commit()
-
-    # 3. Generate the reset URL with the token and email
+    # 2. Generate the reset URL with the token and email
     reset_url = f"{settings.FRONTEND_HOST}/reset-password?token={token}&email={user.email}"
 
-    # 4. Email content
+    # 3. Email content
     data = {
         'app_name': settings.APP_NAME,
         "name": user.name,
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, func, ForeignKey
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, func, ForeignKey
 from app.core.database import Base
 from app.auth.roles import UserRole
 from sqlalchemy.orm import mapped_column, relationship
@@ -17,7 +17,6 @@ class User(Base):
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     
     tokens = relationship("UserToken", back_populates="user")
-    reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan")
     cart_items = relationship("Cart", back_populates="user", cascade="all, delete-orphan")
     orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
     products = relationship("Product", back_populates="creator", cascade="all, delete-orphan")
@@ -29,16 +28,6 @@ class User(Base):
     
     
 
-class PasswordResetToken(Base):
-    __tablename__ = "password_reset_tokens"
-    id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    token = Column(String(255), unique=True, nullable=False)
-    expiration_time = Column(DateTime, nullable=False)
-    used = Column(Boolean, default=False)
-
-    user = relationship("User", back_populates="reset_tokens")
-    
 class UserToken(Base):
     __tablename__ = "user_tokens"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -46,8 +35,10 @@ class UserToken(Base):
     access_key = Column(String(250), nullable=True, index=True, default=None)
     refresh_key = Column(String(250), nullable=True, index=True, default=None)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
-    expires_at = Column(DateTime, nullable=False)
-    
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (Index('ix_user_tokens_user_id_expires_at', 'user_id', 'expires_at'),)
+
     user = relationship("User", back_populates="tokens")
     
 
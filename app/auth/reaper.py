@@ -0,0 +1,47 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select  # type: ignore
+
+from app.auth.models import UserToken
+from app.core.database import AsyncSessionLocal
+from app.core.logger import get_logger
+from app.core.settings import get_settings
+
+settings = get_settings()
+logger = get_logger("auth")
+
+reaper_stats = {
+    "runs": 0,
+    "last_run_at": None,
+    "last_run": {"user_tokens": 0},
+    "total": {"user_tokens": 0},
+}
+
+
+async def _delete_in_batches(model, condition) -> int:
+    # one short transaction per batch so the SQLite write lock is never held for long
+    reclaimed = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            batch = select(model.id).where(condition).limit(settings.TOKEN_REAPER_BATCH_SIZE)
+            result = await session.execute(delete(model).where(model.id.in_(batch)))
+            await session.commit()
+        reclaimed += result.rowcount
+        if result.rowcount < settings.TOKEN_REAPER_BATCH_SIZE:
+            return reclaimed
+        await asyncio.sleep(0)  # let queued requests get the lock between batches
+
+
+async def reap_expired_tokens():
+    now = datetime.utcnow()
+    # keep rows for one access-token lifetime so the stateless revocation list can still be rebuilt
+    token_cutoff = now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    user_tokens = await _delete_in_batches(UserToken, UserToken.expires_at < token_cutoff)
+
+    reaper_stats["runs"] += 1
+    reaper_stats["last_run_at"] = now
+    reaper_stats["last_run"] = {"user_tokens": user_tokens}
+    reaper_stats["total"]["user_tokens"] += user_tokens
+    logger.info(f"Token reaper reclaimed {user_tokens} user token(s)")
@@ -3,18 +3,22 @@ from email.header import Header
 from app.auth.models import User
 from app.auth.schemas import EmailRequest, LoginResponse, RegisterUserRequest, ResetPasswordRequest, UserResponse, VerifyUserRequest
 from app.auth.services import activate_user, create_user,  forgot_password_link, get_login_token, get_refresh_token, logout_service, reset_user_password
-from app.core.database import get_session
+from app.core.database import get_async_session
 from fastapi import APIRouter, Depends # type: ignore
-from sqlalchemy.orm import Session # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
 from fastapi import status, BackgroundTasks ,Request# type: ignore
 from fastapi.security import OAuth2PasswordRequestForm # type: ignore
-from app.core.security import oauth2_scheme, get_current_user
+from app.core.security import admin_required, oauth2_scheme, get_current_user
+from app.core.token_cache import token_cache
+from app.auth.reaper import reaper_stats
+from app.core.rate_limit import RateLimiter
 
 
 user_router = APIRouter(    # register user
     prefix="/users",
     tags=["users"],
     responses={404: {"description": "Not found"}},
+    dependencies=[Depends(RateLimiter("users"))]
 )
 auth_router = APIRouter(    
     prefix="/users",
@@ -27,44 +31,47 @@ guest_router = APIRouter(
     tags=["Auth"],
     responses={404: {"description": "Not found"}},
 )
+# only the credential endpoints are throttled: refresh and logout run every few minutes per user
+# and would exhaust a shared-NAT IP bucket
+auth_rate_limit = Depends(RateLimiter("auth"))
 
 @user_router.post("", status_code=status.HTTP_201_CREATED, response_model=UserResponse)
-async def register_user(data: RegisterUserRequest, background_tasks: BackgroundTasks, session: Session = Depends(get_session)):
+async def register_user(data: RegisterUserRequest, background_tasks: BackgroundTasks, session: AsyncSession = Depends(get_async_session)):
    return await create_user(data, session, background_tasks)
 
 @user_router.post("/verify", status_code=status.HTTP_200_OK)
-async def verify_user(data: VerifyUserRequest, background_tasks: BackgroundTasks, session: Session = Depends(get_session)):
+async def verify_user(data: VerifyUserRequest, background_tasks: BackgroundTasks, session: AsyncSession = Depends(get_async_session)):
    return await activate_user(data, session, background_tasks)
    return JSONResponse({"message": "User activated successfully."})
 """
     Send welcome mail after verification
     """
 
-@guest_router.post("/login", status_code=status.HTTP_200_OK, response_model=LoginResponse)
+@guest_router.post("/login", status_code=status.HTTP_200_OK, response_model=LoginResponse, dependencies=[auth_rate_limit])
 async def login_user(
     data: OAuth2PasswordRequestForm = Depends(),  
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     return await get_login_token(data, session)
 
 @guest_router.post("/refresh", status_code=status.HTTP_200_OK, response_model=LoginResponse)
-async def refresh_tokens(refresh_token = Header(),  session: Session = Depends(get_session)):
+async def refresh_tokens(refresh_token = Header(),  session: AsyncSession = Depends(get_async_session)):
     return await get_refresh_token(refresh_token, session)
 
-@guest_router.post("/forgot-password",status_code=status.HTTP_200_OK)
-async def forgot_password(data: EmailRequest,background_tasks:BackgroundTasks,session:Session = Depends(get_session)): 
+@guest_router.post("/forgot-password",status_code=status.HTTP_200_OK, dependencies=[auth_rate_limit])
+async def forgot_password(data: EmailRequest,background_tasks:BackgroundTasks,session:AsyncSession = Depends(get_async_session)): 
     await forgot_password_link(data,background_tasks,session)
     return {"message": "If the email is registered, a reset link has been sent."}
 
-@guest_router.post("/reset-password",status_code=status.HTTP_200_OK)
-async def reset_password(data: ResetPasswordRequest,session:Session = Depends(get_session)): 
+@guest_router.post("/reset-password",status_code=status.HTTP_200_OK, dependencies=[auth_rate_limit])
+async def reset_password(data: ResetPasswordRequest,session:AsyncSession = Depends(get_async_session)): 
     await reset_user_password(data,session)
     return {"Your password hase been updated successfully."}
 
 @guest_router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout_user(
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)  # or however you're retrieving the authenticated user
 ):
     return await logout_service(current_user, session)
@@ -77,3 +84,18 @@ async def fetch_user(user = Depends(get_current_user)):
     """
     return user
 
+
+@auth_router.get("/token-cache/stats", status_code=status.HTTP_200_OK)
+async def token_cache_stats(current_user: User = Depends(admin_required)):
+    """
+    Hit/miss counters of the access-token validation cache (Admin only)
+    """
+    return token_cache.stats()
+
+
+@auth_router.get("/token-reaper/stats", status_code=status.HTTP_200_OK)
+async def token_reaper_stats(current_user: User = Depends(admin_required)):
+    """
+    Rows reclaimed by the expired-token sweeper, per run and in total (Admin only)
+    """
+    return reaper_stats
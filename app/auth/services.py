@@ -3,17 +3,18 @@ import logging
 from app.auth.models import User, UserToken
 from app.auth.schemas import ResetPasswordRequest
 from app.core.logger import get_logger
-from sqlalchemy.orm import joinedload ,Session # type: ignore
+from sqlalchemy import select, update # type: ignore
+from sqlalchemy.orm import joinedload # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
 from app.auth.utils.email_context import FORGOT_PASSWORD, USER_VERIFY_ACCOUNT
 from app.auth.utils.string import unique_string
 from app.core import settings
-from app.core.security import generate_token, get_token_payload, hash_password, is_password_strong_enough, load_user, str_decode, str_encode, verify_password
+from app.core.revocation import revoked_tokens
+from app.core.token_cache import token_cache
+from app.core.security import generate_token, get_token_payload, hash_password_async, is_password_strong_enough, load_user, str_decode, str_encode, verify_and_update_password_async, verify_signed_token
 from sqlalchemy.exc import IntegrityError  # type: ignore
 from fastapi import HTTPException, status, BackgroundTasks  # type: ignore
 from app.auth.emailService import send_account_activation_confirmation_email, send_account_verification_email, send_password_reset_email
-import secrets
-from datetime import datetime, timedelta
-from app.auth.models import PasswordResetToken
 
 settings = settings.get_settings()
 logger = get_logger("auth")
@@ -39,22 +40,22 @@ async def create_user(data, session, background_tasks):
     user = User(
         name=data.name,
         email=data.email,
-        password=hash_password(data.password),
+        password=await hash_password_async(data.password),
         role=data.role.value,
         is_active=False,
         updated_at=datetime.utcnow()
     )
     session.add(user)
     try:
-        session.commit()
+        await session.commit()
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         logger.warning(f"Registration failed - Email already registered: {data.email}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered."
         )
-    session.refresh(user)
+    await session.refresh(user)
     logger.info(f"User registered successfully: {user.email}")
     await send_account_verification_email(user, background_tasks=background_tasks)
     return user
@@ -62,7 +63,8 @@ async def create_user(data, session, background_tasks):
 
 async def activate_user(data, session, background_tasks):
     logger.info(f"Attempting account activation for: {data.email}")
-    user = session.query(User).filter(User.email == data.email).first()
+    result = await session.execute(select(User).where(User.email == data.email))
+    user = result.scalars().first()
     if not user:
         logger.warning(f"Activation failed - Email not found: {data.email}")
         raise HTTPException(
@@ -71,13 +73,7 @@ async def activate_user(data, session, background_tasks):
         )
     user_token = user.get_context_string(context=USER_VERIFY_ACCOUNT)
 
-    try:
-        token_valid = verify_password(user_token, data.token)
-    except Exception as verify_exec:
-        logging.exception(verify_exec)
-        token_valid = False
-
-    if not token_valid:
+    if not verify_signed_token(data.token, user.id, user_token):
         logger.warning(f"Activation failed - Invalid token for user: {user.email}")
         raise HTTPException(
             status_code=400,
@@ -87,8 +83,8 @@ async def activate_user(data, session, background_tasks):
     user.updated_at = datetime.utcnow()
     user.verified_at = datetime.utcnow()
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     logger.info(f"User activated successfully: {user.email}")
     await send_account_activation_confirmation_email(user, background_tasks)
     return user
@@ -101,7 +97,8 @@ async def get_login_token(data, session):
         logger.warning(f"Login failed - Email not found: {data.username}")
         raise HTTPException(status_code=400, detail="Email is not registered.")
 
-    if not verify_password(data.password, user.password):
+    password_valid, new_hash = await verify_and_update_password_async(data.password, user.password)
+    if not password_valid:
         logger.warning(f"Login failed - Invalid credentials for: {data.username}")
         raise HTTPException(status_code=400, detail="Invalid email or password.")
 
@@ -113,8 +110,14 @@ async def get_login_token(data, session):
         logger.warning(f"Login failed - Account inactive: {user.email}")
         raise HTTPException(status_code=400, detail="Your account is not active.")
 
+    if new_hash:
+        # cost policy changed since this hash was made; saved by the token commit below
+        user.password = new_hash
+        session.add(user)
+        logger.info(f"Password rehashed with current bcrypt cost for: {user.email}")
+
     logger.info(f"Login successful for: {user.email}")
-    return _generate_tokens(user, session)
+    return await _generate_tokens(user, session)
 
 
 async def get_refresh_token(refresh_token, session):
@@ -128,12 +131,13 @@ async def get_refresh_token(refresh_token, session):
     access_key = token_payload.get('a')
     user_id = str_decode(token_payload.get('sub'))
 
-    user_token = session.query(UserToken).options(joinedload(UserToken.user)).filter(
+    result = await session.execute(select(UserToken).options(joinedload(UserToken.user)).where(
         UserToken.refresh_key == refresh_key,
         UserToken.access_key == access_key,
         UserToken.user_id == user_id,
         UserToken.expires_at > datetime.utcnow()
-    ).first()
+    ))
+    user_token = result.scalars().first()
 
     if not user_token:
         logger.warning(f"Refresh token failed - Token not found or expired.")
@@ -141,12 +145,14 @@ async def get_refresh_token(refresh_token, session):
 
     user_token.expires_at = datetime.utcnow()
     session.add(user_token)
-    session.commit()
+    await session.commit()
+    token_cache.invalidate(user_token.id, user_token.access_key)
+    revoked_tokens.revoke([user_token.id])
     logger.info(f"Refresh token successful for user: {user_token.user.email}")
-    return _generate_tokens(user_token.user, session)
+    return await _generate_tokens(user_token.user, session)
 
 
-def _generate_tokens(user, session):
+async def _generate_tokens(user, session):
     refresh_key = unique_string(100)
     access_key = unique_string(50)
     rt_expires = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
@@ -157,14 +163,15 @@ def _generate_tokens(user, session):
     user_token.access_key = access_key
     user_token.expires_at = datetime.utcnow() + rt_expires
     session.add(user_token)
-    session.commit()
-    session.refresh(user_token)
+    await session.commit()
+    await session.refresh(user_token)
 
     at_payload = {
         "sub": str_encode(str(user.id)),
         'a': access_key,
         'r': str_encode(str(user_token.id)),
         'n': str_encode(f"{user.name}"),
+        'e': user.email,
         'role': user.role
     }
 
@@ -195,24 +202,10 @@ async def forgot_password_link(data, background_tasks, session):
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Account not active.")
 
-    # 1. Generate token
-    token = secrets.token_urlsafe(32)
-
-    # 2. Create token object
-    token_obj = PasswordResetToken(
-        user_id=user.id,
-        token=token,
-        expiration_time=datetime.utcnow() + timedelta(minutes=15),
-        used=False
-    )
+    # Send email with a signed reset token (nothing to store, it expires with the password)
+    await send_password_reset_email(user, background_tasks)
 
-    session.add(token_obj)
-    session.commit()
-
-    # 3. Send email (update send_password_reset_email to accept token)
-    await send_password_reset_email(user,  background_tasks,session)
-
-    logger.info(f"Password reset token saved and email sent to: {user.email}")
+    logger.info(f"Password reset email sent to: {user.email}")
 
 
 
@@ -223,46 +216,58 @@ async def reset_user_password(data: ResetPasswordRequest, session):
     if not user or not user.verified_at or not user.is_active:
         raise HTTPException(status_code=400, detail="Invalid Request.")
 
-    # Lookup the token
-    token_entry = session.query(PasswordResetToken).filter_by(
-        user_id=user.id,
-        token=data.token,
-        used=False
-    ).first()
+    # Verify the signed token against the user's current password/updated_at
+    reset_context = user.get_context_string(context=FORGOT_PASSWORD)
 
-    if not token_entry or token_entry.expiration_time < datetime.utcnow():
+    if not verify_signed_token(data.token, user.id, reset_context):
         logger.warning(f"Password reset failed - Invalid/expired token for: {user.email}")
         raise HTTPException(status_code=400, detail="Invalid or expired token.")
 
-    # Update password
-    user.password = hash_password(data.password)
+    # Update password (this also invalidates the token)
+    user.password = await hash_password_async(data.password)
     user.updated_at = datetime.utcnow()
 
-    # Mark token as used
-    token_entry.used = True
-    session.add_all([user, token_entry])
-    session.commit()
-    session.refresh(user)
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
 
     logger.info(f"Password reset successful for: {user.email}")
     return {"message": "Your password has been updated successfully."}
 
 
 
-async def logout_service(current_user: User, session: Session):
+async def logout_service(current_user: User, session: AsyncSession):
     logger.info(f"Logout attempt for: {current_user.email}")
 
     try:
-        tokens = session.query(UserToken).filter(UserToken.user_id == current_user.id).all()
-        if not tokens:
+        # expire instead of delete so the revocation list can be rebuilt after a restart
+        now = datetime.utcnow()
+        result = await session.execute(update(UserToken).where(
+            UserToken.user_id == current_user.id,
+            UserToken.expires_at > now
+        ).values(expires_at=now).returning(UserToken.id))
+        token_ids = result.scalars().all()
+        if not token_ids:
             logger.warning(f"No active tokens found for user: {current_user.email}")
         else:
-            for token in tokens:
-                session.delete(token)
-            session.commit()
+            await session.commit()
+            token_cache.invalidate_user(current_user.id)
+            revoked_tokens.revoke(token_ids)
             logger.info(f"User logged out successfully: {current_user.email}")
         return {"detail": "Logout successful."}
     except Exception as e:
         logger.error(f"Logout failed for user {current_user.email}: {str(e)}")
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail="Logout failed. Please try again.")
+
+
+async def rebuild_revoked_tokens(session: AsyncSession):
+    # tokens revoked (expired early) within the access-token lifetime may still have live JWTs
+    now = datetime.utcnow()
+    result = await session.execute(select(UserToken.id).where(
+        UserToken.expires_at <= now,
+        UserToken.expires_at > now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    ))
+    token_ids = result.scalars().all()
+    revoked_tokens.revoke(token_ids)
+    logger.info(f"Revocation list rebuilt with {len(token_ids)} token(s).")
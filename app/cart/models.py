@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 class Cart(Base):
@@ -8,8 +10,14 @@ class Cart(Base):
     user_id = Column(Integer,ForeignKey("users.id"),nullable=False)
     product_id= Column(Integer,ForeignKey("products.id"),nullable=False)
     quantity = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False, server_default="1")
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    __table_args__ = (UniqueConstraint('user_id', 'product_id', name='_user_product_uc'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'product_id', name='_user_product_uc'),
+        Index('ix_cart_updated_at', 'updated_at'),  # abandoned-cart sweeper scans oldest lines first
+    )
+    __mapper_args__ = {"version_id_col": version}
 
     user = relationship("User", back_populates="cart_items")
     product = relationship("Product",back_populates="cart_entries")
\ No newline at end of file
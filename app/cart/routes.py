@@ -1,15 +1,22 @@
 from app.auth.models import User
-from app.core.security import  get_current_user, user_required
+from app.core.security import  admin_required, get_current_user, user_required
+from app.cart.store import cart_store
+from app.cart.sweeper import sweeper_stats
 from app.cart import schemas, services
-from fastapi import APIRouter, Depends, HTTPException,status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException,status,Query,Request,Response
 from sqlalchemy.orm import Session
+from app.core.conditional import is_not_modified, make_etag, not_modified, validator_headers
 from app.core.database import get_session
+from app.core.pagination import set_next_cursor
+from app.core.settings import get_settings
 from fastapi.responses import JSONResponse
 
 cart_router = APIRouter(
     prefix="/cart",
     tags=["cart"],
     responses={404: {"description": "Not found"}},)
+settings = get_settings()
 
 @cart_router.post("/", response_model=schemas.CartResponse, status_code=status.HTTP_201_CREATED)
 def add_to_cart(
@@ -20,12 +27,52 @@ def add_to_cart(
     return services.add_to_cart(db, current_user.id, cart_data)
 
 
-@cart_router.get("/", response_model=list[schemas.CartResponse])
+@cart_router.get("/", response_model=schemas.CartView)
 def view_cart(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_session),
     current_user: User = Depends(user_required)
 ):
-    return services.get_cart_items(db, current_user.id)
+    etag = make_etag("cart", current_user.id, *services.get_cart_state(db, current_user.id), skip, limit, cursor)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    rows, cart = services.get_cart_view(db, current_user.id, skip, limit, cursor)
+    set_next_cursor(response, rows, limit, None, lambda row: None)
+    response.headers.update(validator_headers(etag))  # no Last-Modified: deletions leave no timestamp behind
+    return cart
+
+
+@cart_router.post("/batch", response_model=schemas.CartView)
+def apply_cart_batch(
+    batch: schemas.CartBatch,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(user_required)
+):
+    """
+    Apply a list of add/set/remove operations in one transaction and return the resulting cart (first 100 lines).
+    """
+    return services.apply_cart_batch(db, current_user.id, batch)
+
+
+@cart_router.get("/store/stats")
+def cart_store_stats(current_user: User = Depends(admin_required)):
+    """
+    Write-behind cart store: carts in memory, dirty carts and flush history (Admin only).
+    """
+    return {"store": settings.CART_STORE, **cart_store.stats()}
+
+
+@cart_router.get("/sweeper/stats")
+def cart_sweeper_stats(current_user: User = Depends(admin_required)):
+    """
+    Abandoned-cart lines expired per sweeper run and in total (Admin only).
+    """
+    return {"ttl_days": settings.CART_TTL_DAYS, **sweeper_stats}
 
 
 @cart_router.delete("/{product_id}", status_code=status.HTTP_200_OK)
@@ -4,8 +4,10 @@ from pydantic import BaseModel, EmailStr, Field, field_validator,PositiveInt, co
 from app.auth.roles import UserRole
 from typing import Annotated
 
-from pydantic import BaseModel, Field, PositiveInt, conint
-from typing import Optional
+from pydantic import BaseModel, Field, PositiveInt, conint, model_validator
+from typing import List, Literal, Optional
+
+CartMode = Literal["set", "increment"]
 
 # Shared base schema for reuse
 class CartBase(BaseModel):
@@ -14,11 +16,20 @@ class CartBase(BaseModel):
 
 # Schema for cart item creation
 class CartCreate(CartBase):
-    pass
+    mode: CartMode = Field("increment", description="increment adds to a line already in the cart, set replaces its quantity")
 
 # Schema for updating quantity
 class CartUpdate(BaseModel):
-    quantity: Annotated[conint(ge=1, le=100) , Field(..., description="Updated quantity must be between 1 and 100")]
+    quantity: Annotated[conint(ge=-99, le=100) , Field(..., description="New quantity (set) or change to apply (increment); the result must stay between 1 and 100")]
+    mode: CartMode = Field("set", description="set replaces the quantity, increment adds (or with a negative value, removes) units")
+
+    @model_validator(mode="after")
+    def check_quantity(self):
+        if self.mode == "set" and self.quantity < 1:
+            raise ValueError("Updated quantity must be between 1 and 100")
+        if self.mode == "increment" and self.quantity == 0:
+            raise ValueError("Increment must not be 0")
+        return self
 
 # Schema for returning cart data
 class CartResponse(BaseModel):
@@ -31,3 +42,33 @@ class CartResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+# One line of the cart view, with its server-side subtotal
+class CartLine(CartResponse):
+    subtotal: float = Field(..., description="quantity x current product price")
+
+
+# Cart view envelope: totals cover the whole cart, items only the requested page
+class CartView(BaseModel):
+    items: List[CartLine]
+    line_count: int = Field(..., description="Distinct products in the cart")
+    item_count: int = Field(..., description="Sum of quantities")
+    grand_total: float
+
+
+# One offline cart edit: add (increment), set (replace, creating the line if needed) or remove
+class CartOperation(BaseModel):
+    op: Literal["add", "set", "remove"]
+    product_id: PositiveInt = Field(..., description="ID of the product (must be > 0)")
+    quantity: Optional[Annotated[conint(ge=1, le=100), Field(description="Required for add/set, between 1 and 100")]] = None
+
+    @model_validator(mode="after")
+    def check_quantity(self):
+        if self.op != "remove" and self.quantity is None:
+            raise ValueError("quantity is required for add and set operations")
+        return self
+
+
+# Operations are applied in order, all or nothing
+class CartBatch(BaseModel):
+    operations: List[CartOperation] = Field(..., min_length=1, max_length=100)
@@ -1,51 +1,104 @@
+from datetime import datetime
+from typing import Optional
+
 from app.core.logger import get_logger
+from app.core.pagination import decode_cursor
 from sqlalchemy.orm import Session
 from fastapi.responses import JSONResponse
 
 from app.cart.models import Cart
-from app.cart.schemas import CartCreate, CartUpdate
-from app.product.models import Product
+from app.cart.schemas import CartBatch, CartCreate, CartUpdate
+from app.cart.store import cart_store
+from app.product.models import CatalogState, Product
+from sqlalchemy import DateTime, bindparam, func, select, text, true
 
 from fastapi import status,HTTPException
 
 logger = get_logger("cart")
 
 
-def add_to_cart(db: Session, user_id: int, data: CartCreate):
-    try:
-        logger.info(f"Adding product {data.product_id} to cart for user {user_id}")
+# Cart writes are single statements: the 1-100 bound and the product existence check live in SQL,
+# RETURNING hands back the line with its product summary. Core statements bypass version_id_col,
+# so version/updated_at are bumped explicitly to keep cart ETags moving.
+CART_LINE_RETURNING = """
+    RETURNING product_id, quantity,
+        (SELECT name FROM products WHERE products.id = cart.product_id) AS name,
+        (SELECT price FROM products WHERE products.id = cart.product_id) AS price,
+        (SELECT image_url FROM products WHERE products.id = cart.product_id) AS image_url
+"""
 
-        item_exist = db.query(Cart).filter_by(user_id=user_id, product_id=data.product_id).first()
-        if item_exist:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Product already in cart. Update quantity instead."
-            )
+NEW_QUANTITY = "CASE WHEN :mode = 'set' THEN {value} ELSE cart.quantity + {value} END"
 
-        product = db.query(Product).filter_by(id=data.product_id).first()
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found"
-            )
+UPSERT_CART_LINE_SQL = text(f"""
+    INSERT INTO cart (user_id, product_id, quantity, version, updated_at)
+    SELECT :user_id, id, :quantity, 1, :now FROM products WHERE id = :product_id AND :quantity BETWEEN 1 AND 100
+    ON CONFLICT (user_id, product_id) DO UPDATE SET
+        quantity = {NEW_QUANTITY.format(value="excluded.quantity")},
+        version = cart.version + 1,
+        updated_at = excluded.updated_at
+    WHERE {NEW_QUANTITY.format(value="excluded.quantity")} BETWEEN 1 AND 100
+    {CART_LINE_RETURNING}
+""").bindparams(bindparam("now", type_=DateTime))
 
-        if not (1 <= data.quantity <= 100):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Quantity must be between 1 and 100"
-            )
+UPDATE_CART_LINE_SQL = text(f"""
+    UPDATE cart SET
+        quantity = {NEW_QUANTITY.format(value=":quantity")},
+        version = version + 1,
+        updated_at = :now
+    WHERE user_id = :user_id AND product_id = :product_id
+      AND {NEW_QUANTITY.format(value=":quantity")} BETWEEN 1 AND 100
+    {CART_LINE_RETURNING}
+""").bindparams(bindparam("now", type_=DateTime))
 
-        cart_item = Cart(
-            user_id=user_id, 
-            product_id=data.product_id, 
-            quantity=data.quantity
-            )
-        db.add(cart_item)
+DELETE_CART_LINE_SQL = text("DELETE FROM cart WHERE user_id = :user_id AND product_id = :product_id RETURNING id")
+
+# only run when a write matched nothing, to tell the client why
+CART_LINE_STATE_SQL = text("""
+    SELECT (SELECT 1 FROM products WHERE id = :product_id) AS product_exists,
+           (SELECT quantity FROM cart WHERE user_id = :user_id AND product_id = :product_id) AS quantity
+""")
+
+
+def _cart_line(row) -> dict:
+    return {
+        "product_id": row.product_id,
+        "quantity": row.quantity,
+        "product": {"name": row.name, "price": row.price, "image_url": row.image_url},
+    }
+
+
+def _explain_rejected_write(db: Session, user_id: int, product_id: int, require_line: bool):
+    state = db.execute(CART_LINE_STATE_SQL, {"user_id": user_id, "product_id": product_id}).one()
+    if not state.product_exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    if require_line and state.quantity is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Quantity must be between 1 and 100 (currently {state.quantity or 0} in cart)"
+    )
+
+
+def add_to_cart(db: Session, user_id: int, data: CartCreate):
+    try:
+        logger.info(f"Adding product {data.product_id} to cart for user {user_id} ({data.mode})")
+        if cart_store.enabled:
+            return _cart_line(cart_store.write(db, user_id, data.product_id, data.quantity, data.mode, require_line=False))
+
+        row = db.execute(UPSERT_CART_LINE_SQL, {
+            "user_id": user_id,
+            "product_id": data.product_id,
+            "quantity": data.quantity,
+            "mode": data.mode,
+            "now": datetime.utcnow(),
+        }).first()
+        if not row:
+            db.rollback()
+            _explain_rejected_write(db, user_id, data.product_id, require_line=False)
         db.commit()
-        db.refresh(cart_item)
 
         logger.info("Product added to cart successfully")
-        return cart_item
+        return _cart_line(row)
 
     except HTTPException as ht: #custom exceptions
         raise ht 
@@ -55,29 +108,90 @@ def add_to_cart(db: Session, user_id: int, data: CartCreate):
         raise HTTPException(status_code=500, detail="Failed to add product to cart")
 
 
-def get_cart_items(db: Session, user_id: int): #get cart items present for current signed in user
+def get_cart_state(db: Session, user_id: int):
+    if cart_store.enabled:
+        return cart_store.state(db, user_id)
+    # one narrow query: (id, product, quantity, version) of every line plus the catalog version (lines embed
+    # product data). Counts/sums are not enough: SQLite reuses the highest rowid, so swapping a line can
+    # leave count/max(id)/sum(version) unchanged while the cart is different.
+    catalog_version = select(CatalogState.version).where(CatalogState.id == 1).scalar_subquery()
+    rows = db.query(
+        Cart.id, Cart.product_id, Cart.quantity, Cart.version, catalog_version
+    ).filter(Cart.user_id == user_id).order_by(Cart.id).all()
+    lines = tuple((row[0], row[1], row[2], row[3]) for row in rows)
+    return lines, rows[0][4] if rows else None  # an empty cart embeds no product data
+
+
+def get_cart_view(db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None): #cart page + totals for current signed in user
     try:
-        logger.info(f"Fetching cart items for user {user_id}")
-        
-        return db.query(Cart).filter_by(user_id=user_id).all()
+        logger.info(f"Fetching cart for user {user_id}")
+        if cart_store.enabled:
+            rows, (line_count, item_count, grand_total) = cart_store.view(db, user_id, skip, limit, cursor)
+        else:
+            rows, (line_count, item_count, grand_total) = _cart_page(db, user_id, skip, limit, cursor)
+
+        items = [{
+            "product_id": row.product_id,
+            "quantity": row.quantity,
+            "product": {"name": row.name, "price": row.price, "image_url": row.image_url},
+            "subtotal": round(row.quantity * row.price, 2),
+        } for row in rows]
+        return rows, {
+            "items": items,
+            "line_count": line_count,
+            "item_count": item_count,
+            "grand_total": round(grand_total, 2),
+        }
 
+    except HTTPException as ht:
+        raise ht
     except Exception as e:
         logger.error(f"Error fetching cart items: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch cart items")
 
 
+def _cart_page(db: Session, user_id: int, skip: int, limit: int, cursor: Optional[str]):
+    # whole-cart totals as a one-row derived table, so the page and the totals come back in one statement
+    totals = select(
+        func.count(Cart.id).label("line_count"),
+        func.coalesce(func.sum(Cart.quantity), 0).label("item_count"),
+        func.coalesce(func.sum(Cart.quantity * Product.price), 0).label("grand_total"),
+    ).join(Product, Product.id == Cart.product_id).where(Cart.user_id == user_id).subquery()
+
+    query = select(
+        Cart.id, Cart.product_id, Cart.quantity, Product.name, Product.price, Product.image_url,
+        totals.c.line_count, totals.c.item_count, totals.c.grand_total,
+    ).join(Product, Product.id == Cart.product_id).join(totals, true()).where(
+        Cart.user_id == user_id
+    ).order_by(Cart.id.asc())
+    if cursor:
+        _, last_id = decode_cursor(cursor, None)
+        query = query.where(Cart.id > last_id)
+    else:
+        query = query.offset(skip)
+    rows = db.execute(query.limit(limit)).all()
+
+    if rows:
+        return rows, (rows[0].line_count, rows[0].item_count, rows[0].grand_total)
+    if skip or cursor:  # past the last page: totals still describe the whole cart
+        return rows, tuple(db.execute(select(totals)).one())
+    return rows, (0, 0, 0)
+
+
 def remove_cart_item(db: Session, user_id: int, product_id: int):
     try:
         logger.info(f"Removing product {product_id} from user {user_id}'s cart")
 
-        cart_item = db.query(Cart).filter_by(user_id=user_id, product_id=product_id).first()
-        if not cart_item:
+        if cart_store.enabled:
+            removed = cart_store.remove(db, user_id, product_id)
+        else:
+            removed = db.execute(DELETE_CART_LINE_SQL, {"user_id": user_id, "product_id": product_id}).first()
+        if not removed:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cart item not found"
             )
-
-        db.delete(cart_item)
         db.commit()
 
         logger.info("Item removed from cart successfully")
@@ -92,30 +206,73 @@ def remove_cart_item(db: Session, user_id: int, product_id: int):
 
 def update_cart_quantity(db: Session, user_id: int, product_id: int, update_data: CartUpdate): #cartupdate-> as response model
     try:
-        logger.info(f"Updating quantity of product {product_id} in user {user_id}'s cart")
+        logger.info(f"Updating quantity of product {product_id} in user {user_id}'s cart ({update_data.mode})")
+        if cart_store.enabled:
+            return _cart_line(cart_store.write(db, user_id, product_id, update_data.quantity, update_data.mode, require_line=True))
 
-        cart_item = db.query(Cart).filter_by(user_id=user_id, product_id=product_id).first()
-        if not cart_item:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Cart item not found"
-            )
-
-        if not (1 <= update_data.quantity <= 100):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Quantity must be between 1 and 100"
-            )
-
-        cart_item.quantity = update_data.quantity # only quantity updated
+        row = db.execute(UPDATE_CART_LINE_SQL, {
+            "user_id": user_id,
+            "product_id": product_id,
+            "quantity": update_data.quantity,
+            "mode": update_data.mode,
+            "now": datetime.utcnow(),
+        }).first()
+        if not row:
+            db.rollback()
+            _explain_rejected_write(db, user_id, product_id, require_line=True)
         db.commit()
-        db.refresh(cart_item)
 
         logger.info("Cart quantity updated successfully")
-        return cart_item
+        return _cart_line(row)
 
     except HTTPException as ht:
         raise ht
     except Exception as e:
         logger.error(f"Error updating cart quantity: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to update cart quantity")
+
+
+def apply_cart_batch(db: Session, user_id: int, batch: CartBatch):
+    try:
+        logger.info(f"Applying {len(batch.operations)} cart operations for user {user_id}")
+
+        # validate every referenced product with one IN query before touching the cart
+        wanted = {op.product_id for op in batch.operations if op.op != "remove"}
+        found = set(db.scalars(select(Product.id).where(Product.id.in_(wanted)))) if wanted else set()
+        missing = sorted(wanted - found)
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Products not found: {missing}")
+
+        if cart_store.enabled:
+            cart_store.apply_batch(db, user_id, batch.operations)
+            _, cart = get_cart_view(db, user_id)
+            return cart
+
+        now = datetime.utcnow()
+        for index, op in enumerate(batch.operations):
+            params = {"user_id": user_id, "product_id": op.product_id}
+            if op.op == "remove":
+                db.execute(DELETE_CART_LINE_SQL, params)  # removing an absent line is a no-op when replaying edits
+                continue
+            row = db.execute(UPSERT_CART_LINE_SQL, {
+                **params, "quantity": op.quantity, "mode": "increment" if op.op == "add" else "set", "now": now,
+            }).first()
+            if not row:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Operation {index}: quantity of product {op.product_id} must stay between 1 and 100"
+                )
+        db.commit()  # one transaction (and one write-lock hold) for the whole batch
+
+        logger.info("Cart batch applied successfully")
+        _, cart = get_cart_view(db, user_id)
+        return cart
+
+    except HTTPException as ht:
+        db.rollback()
+        raise ht
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error applying cart batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to apply cart operations")
@@ -0,0 +1,346 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, bindparam, delete, select, text
+from sqlalchemy.orm import Session
+
+from app.cart.models import Cart
+from app.core.database import SessionLocal
+from app.core.logger import get_logger
+from app.core.pagination import decode_cursor
+from app.core.settings import get_settings
+from app.product.models import CatalogState, Product
+
+logger = get_logger("cart")
+settings = get_settings()
+
+CART_STORES = ("sql", "memory")
+
+# durable copy of one in-memory line; skips products deleted since, leaves unchanged rows untouched
+FLUSH_CART_LINE_SQL = text("""
+    INSERT INTO cart (user_id, product_id, quantity, version, updated_at)
+    SELECT :user_id, id, :quantity, 1, :now FROM products WHERE id = :product_id
+    ON CONFLICT (user_id, product_id) DO UPDATE SET
+        quantity = excluded.quantity,
+        version = cart.version + 1,
+        updated_at = excluded.updated_at
+    WHERE cart.quantity != excluded.quantity
+""").bindparams(bindparam("now", type_=DateTime))
+
+
+class CartLine(NamedTuple):
+    id: int  # stable line id (cart.id when loaded, then increasing per new line), what view cursors point past
+    product_id: int
+    quantity: int
+    name: str
+    price: float
+    image_url: str
+
+
+class WriteBehindCartStore:
+    """
+    Cart lines served from memory (CART_STORE=memory) and written to the `cart` table in the background.
+
+    A user's cart is loaded from the table on first use and kept in an LRU of at most
+    CART_STORE_MAX_USERS carts (only clean carts are evicted). Edits mark the cart dirty;
+    `flush` writes dirty carts in batches of CART_FLUSH_BATCH_USERS users per transaction,
+    every CART_FLUSH_INTERVAL_SECONDS and once more on shutdown.
+
+    Crash recovery: the table is the only durable copy. A graceful shutdown loses nothing;
+    a crash loses the edits acknowledged since the last successful flush (at most one flush
+    interval, longer only if flushes were failing, which is logged and counted in stats).
+    On restart carts reload lazily from the table as it was last flushed. A failed batch
+    stays dirty and is retried on the next flush. Checkout holds the user's cart (`checking_out`):
+    it is flushed, edits are refused until the order commits, then it is dropped from memory, so
+    an order always contains every acknowledged edit and purchased lines are never flushed back.
+
+    State lives in one process: run a single worker with this store, or keep CART_STORE=sql.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time (timer, shutdown, checkout)
+        # user_id -> {product_id: (line_id, quantity)}, LRU order
+        self._carts: "OrderedDict[int, Dict[int, Tuple[int, int]]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._dirty: Set[int] = set()
+        self._checking_out: Set[int] = set()
+        self._touched: Dict[int, Set[int]] = {}  # user_id -> product ids edited since the cart's last flush
+        self._clock = 0
+        self._last_line_id = 0
+        self._epoch = uuid.uuid4().hex  # ETags from a previous process never match
+        self.session_factory: Callable[[], Session] = SessionLocal
+        self._stats = {"flushes": 0, "carts_flushed": 0, "lines_flushed": 0, "flush_failures": 0,
+                       "last_flush_at": None, "last_flush_ms": None}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CART_STORE == "memory"
+
+    # reads
+
+    def state(self, db: Session, user_id: int) -> tuple:
+        """ETag inputs, the in-memory counterpart of services.get_cart_state."""
+        self._load(db, user_id)
+        catalog_version = db.query(CatalogState.version).filter(CatalogState.id == 1).scalar()
+        with self._lock:
+            return self._epoch, self._versions.get(user_id), len(self._carts.get(user_id, ())), catalog_version
+
+    def view(self, db: Session, user_id: int, skip: int, limit: int,
+             cursor: Optional[str]) -> Tuple[List[CartLine], Tuple[int, int, float]]:
+        lines = self._edit(db, user_id, lambda cart: (False, sorted(cart.items(), key=lambda line: line[1][0])),
+                           writes=False)
+        products = {}
+        if lines:
+            products = {row.id: row for row in db.execute(
+                select(Product.id, Product.name, Product.price, Product.image_url)
+                .where(Product.id.in_([product_id for product_id, _ in lines]))
+            )}
+        rows = [
+            CartLine(line_id, product_id, quantity, products[product_id].name,
+                     products[product_id].price, products[product_id].image_url)
+            for product_id, (line_id, quantity) in lines if product_id in products
+        ]
+        totals = (len(rows), sum(row.quantity for row in rows), sum(row.quantity * row.price for row in rows))
+        if cursor:
+            # keyed on the line id, like cart.id in the SQL store: removing an earlier line skips nothing
+            _, last_id = decode_cursor(cursor, None)
+            return [row for row in rows if row.id > last_id][:limit], totals
+        return rows[skip:skip + limit], totals
+
+    # writes
+
+    def write(self, db: Session, user_id: int, product_id: int, quantity: int, mode: str,
+              require_line: bool) -> CartLine:
+        product = db.execute(
+            select(Product.name, Product.price, Product.image_url).where(Product.id == product_id)
+        ).first()
+        if not product:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+        def edit(cart: Dict[int, Tuple[int, int]]):
+            line_id, current = cart.get(product_id, (None, None))
+            if require_line and current is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
+            new_quantity = quantity if mode == "set" or current is None else current + quantity
+            if not 1 <= new_quantity <= 100:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Quantity must be between 1 and 100 (currently {current or 0} in cart)"
+                )
+            line_id = line_id or self._new_line_id(cart)
+            cart[product_id] = (line_id, new_quantity)
+            return True, (line_id, new_quantity)
+
+        line_id, new_quantity = self._edit(db, user_id, edit, touched=(product_id,))
+        return CartLine(line_id, product_id, new_quantity, product.name, product.price, product.image_url)
+
+    def remove(self, db: Session, user_id: int, product_id: int) -> bool:
+        return self._edit(db, user_id, lambda cart: (True, True) if cart.pop(product_id, None) else (False, False),
+                          touched=(product_id,))
+
+    def apply_batch(self, db: Session, user_id: int, operations: list) -> None:
+        """Apply validated CartOperations all-or-nothing: on a bound violation the cart is left untouched."""
+        def edit(cart: Dict[int, Tuple[int, int]]):
+            updated = dict(cart)
+            for index, op in enumerate(operations):
+                if op.op == "remove":
+                    updated.pop(op.product_id, None)
+                    continue
+                line_id, current = updated.get(op.product_id, (None, None))
+                new_quantity = op.quantity if op.op == "set" or current is None else current + op.quantity
+                if not 1 <= new_quantity <= 100:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Operation {index}: quantity of product {op.product_id} must stay between 1 and 100"
+                    )
+                updated[op.product_id] = (line_id or self._new_line_id(updated), new_quantity)
+            cart.clear()
+            cart.update(updated)
+            return True, None
+
+        self._edit(db, user_id, edit, touched={op.product_id for op in operations})
+
+    # durability
+
+    def flush(self, user_ids: Optional[List[int]] = None) -> int:
+        """Write dirty carts (all, or just `user_ids`) to the cart table; returns how many were written."""
+        with self._flush_lock:
+            started = time.perf_counter()
+            with self._lock:
+                users = list(self._dirty) if user_ids is None else [u for u in user_ids if u in self._dirty]
+                snapshot = [(user_id, [(product_id, quantity) for product_id, (_, quantity) in self._carts[user_id].items()])
+                            for user_id in users]
+                self._dirty.difference_update(users)  # edits made during the flush re-mark the cart
+                touched = {user_id: self._touched.pop(user_id, set()) for user_id in users}
+
+            flushed = lines = 0
+            for start in range(0, len(snapshot), settings.CART_FLUSH_BATCH_USERS):
+                chunk = snapshot[start:start + settings.CART_FLUSH_BATCH_USERS]
+                try:
+                    # one short transaction per chunk so checkouts get the write lock in between
+                    with self.session_factory() as session:
+                        now = datetime.utcnow()
+                        for user_id, cart_lines in chunk:
+                            product_ids = [product_id for product_id, _ in cart_lines]
+                            session.execute(
+                                delete(Cart).where(Cart.user_id == user_id, Cart.product_id.not_in(product_ids))
+                                .execution_options(synchronize_session=False)
+                            )
+                            if cart_lines:
+                                session.execute(FLUSH_CART_LINE_SQL, [
+                                    {"user_id": user_id, "product_id": product_id, "quantity": quantity, "now": now}
+                                    for product_id, quantity in cart_lines
+                                ])
+                        session.commit()
+                    flushed += len(chunk)
+                    lines += sum(len(cart_lines) for _, cart_lines in chunk)
+                except Exception as e:
+                    with self._lock:
+                        for user_id, _ in chunk:  # retried on the next flush
+                            self._dirty.add(user_id)
+                            self._touched.setdefault(user_id, set()).update(touched[user_id])
+                        self._stats["flush_failures"] += 1
+                    logger.error(f"Cart flush of {len(chunk)} cart(s) failed: {e}", exc_info=True)
+
+            with self._lock:
+                self._evict()
+                if snapshot:
+                    self._stats["flushes"] += 1
+                    self._stats["carts_flushed"] += flushed
+                    self._stats["lines_flushed"] += lines
+                    self._stats["last_flush_at"] = datetime.utcnow()
+                    self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            if snapshot:
+                logger.info(f"Cart flush wrote {flushed}/{len(snapshot)} cart(s), {lines} line(s)")
+            return flushed
+
+    @contextmanager
+    def checking_out(self, user_id: int):
+        """
+        Make the table authoritative for one cart while an order is built from it: flush it, refuse
+        edits until the caller's transaction is done, then drop it from memory (it reloads post-checkout).
+        """
+        with self._lock:
+            if user_id in self._checking_out:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Checkout already in progress")
+            self._checking_out.add(user_id)
+        try:
+            self.flush([user_id])
+            with self._lock:
+                if user_id in self._dirty:
+                    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                        detail="Cart could not be saved, please retry")
+            yield
+        finally:
+            with self._lock:
+                self._checking_out.discard(user_id)
+                if user_id not in self._dirty:
+                    self._carts.pop(user_id, None)
+                    self._versions.pop(user_id, None)
+
+    @contextmanager
+    def flushes_paused(self):
+        """Hold off flushes (timer, shutdown, checkout) while the caller changes cart rows behind the store."""
+        with self._flush_lock:
+            yield
+
+    def expire(self, swept: Dict[int, Set[int]]) -> None:
+        """
+        Drop lines the cart sweeper deleted from the table ({user_id: product ids}). Clean carts are
+        dropped whole and reload; dirty carts lose the expired lines unless they were edited since the
+        last flush, so the next flush doesn't write abandoned lines back.
+        """
+        with self._lock:
+            for user_id, product_ids in swept.items():
+                cart = self._carts.get(user_id)
+                if cart is None:
+                    continue
+                if user_id not in self._dirty:
+                    del self._carts[user_id]
+                    self._versions.pop(user_id, None)
+                    continue
+                edited = self._touched.get(user_id, set())
+                expired = [product_id for product_id in product_ids if product_id in cart and product_id not in edited]
+                for product_id in expired:
+                    del cart[product_id]
+                if expired:
+                    self._bump(user_id)
+
+    def forget(self, user_ids: List[int]) -> None:
+        """Drop clean in-memory carts whose table rows were changed behind the store's back."""
+        with self._lock:
+            for user_id in user_ids:
+                if user_id not in self._dirty:
+                    self._carts.pop(user_id, None)
+                    self._versions.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "carts_in_memory": len(self._carts), "dirty_carts": len(self._dirty)}
+
+    # internals
+
+    def _load(self, db: Session, user_id: int) -> None:
+        with self._lock:
+            if user_id in self._carts:
+                self._carts.move_to_end(user_id)
+                return
+        # query outside the lock; if another request loaded it meanwhile, theirs wins
+        rows = db.execute(
+            select(Cart.id, Cart.product_id, Cart.quantity).where(Cart.user_id == user_id).order_by(Cart.id)
+        ).all()
+        with self._lock:
+            if user_id not in self._carts:
+                self._carts[user_id] = {product_id: (line_id, quantity) for line_id, product_id, quantity in rows}
+                self._bump(user_id)
+                self._evict()
+
+    def _edit(self, db: Session, user_id: int, edit, writes: bool = True, touched=()):
+        """Run edit(cart) -> (changed, result) on the loaded cart under the lock."""
+        while True:
+            self._load(db, user_id)
+            with self._lock:
+                if writes and user_id in self._checking_out:
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                        detail="Checkout in progress, please retry")
+                cart = self._carts.get(user_id)
+                if cart is None:
+                    continue  # evicted between load and lock
+                changed, result = edit(cart)
+                if changed:
+                    self._dirty.add(user_id)
+                    self._touched.setdefault(user_id, set()).update(touched)
+                    self._bump(user_id)
+                return result
+
+    def _new_line_id(self, cart: Dict[int, Tuple[int, int]]) -> int:
+        # above every line already in the cart, so new lines sort (and page) after the existing ones
+        self._last_line_id = max([self._last_line_id, *(line_id for line_id, _ in cart.values())]) + 1
+        return self._last_line_id
+
+    def _bump(self, user_id: int) -> None:
+        self._clock += 1
+        self._versions[user_id] = self._clock
+
+    def _evict(self) -> None:
+        excess = len(self._carts) - settings.CART_STORE_MAX_USERS
+        if excess <= 0:
+            return
+        for user_id in [u for u in self._carts if u not in self._dirty][:excess]:
+            del self._carts[user_id]
+            self._versions.pop(user_id, None)
+
+
+cart_store = WriteBehindCartStore()
+
+
+async def flush_carts():
+    await asyncio.to_thread(cart_store.flush)
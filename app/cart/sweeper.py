@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select  # type: ignore
+
+from app.cart.models import Cart
+from app.cart.store import cart_store
+from app.core.database import SessionLocal
+from app.core.logger import get_logger
+from app.core.settings import get_settings
+
+settings = get_settings()
+logger = get_logger("cart")
+
+sweeper_stats = {
+    "runs": 0,
+    "last_run_at": None,
+    "last_run": {"cart_lines": 0, "carts": 0},
+    "total": {"cart_lines": 0},
+}
+
+
+def _sweep_batch(cutoff: datetime) -> list:
+    # the delete and expire() run under the store's flush lock: a flush in between would write the
+    # swept lines of dirty in-memory carts straight back
+    with cart_store.flushes_paused():
+        # one short transaction per batch (oldest first via ix_cart_updated_at) so the SQLite write lock is never held for long
+        with SessionLocal() as session:
+            batch = select(Cart.id).where(Cart.updated_at < cutoff).order_by(Cart.updated_at).limit(settings.CART_SWEEPER_BATCH_SIZE)
+            lines = session.execute(
+                delete(Cart).where(Cart.id.in_(batch)).returning(Cart.user_id, Cart.product_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            session.commit()
+        if lines and cart_store.enabled:
+            swept = {}
+            for user_id, product_id in lines:
+                swept.setdefault(user_id, set()).add(product_id)
+            cart_store.expire(swept)  # in-memory copies would still show the lines, and dirty ones flush them back
+    return lines
+
+
+async def sweep_abandoned_carts():
+    if settings.CART_TTL_DAYS <= 0:
+        return
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=settings.CART_TTL_DAYS)
+    expired = 0
+    swept = {}
+    while True:
+        lines = await asyncio.to_thread(_sweep_batch, cutoff)
+        expired += len(lines)
+        for user_id, product_id in lines:
+            swept.setdefault(user_id, set()).add(product_id)
+        if len(lines) < settings.CART_SWEEPER_BATCH_SIZE:
+            break
+        await asyncio.sleep(0)  # let queued requests get the lock between batches
+
+    sweeper_stats["runs"] += 1
+    sweeper_stats["last_run_at"] = now
+    sweeper_stats["last_run"] = {"cart_lines": expired, "carts": len(swept)}
+    sweeper_stats["total"]["cart_lines"] += expired
+    logger.info(f"Cart sweeper expired {expired} cart line(s) from {len(swept)} cart(s) idle since {cutoff:%Y-%m-%d %H:%M}")
@@ -0,0 +1,52 @@
+import argparse
+import time
+
+from passlib.hash import bcrypt  # type: ignore
+
+SAMPLE_PASSWORD = "Calibrate#2024"
+
+
+def measure_hash_ms(rounds: int, samples: int = 3) -> float:
+    """Best-of-`samples` wall time (ms) of one bcrypt hash at `rounds` on this machine."""
+    hasher = bcrypt.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(SAMPLE_PASSWORD)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int, max_rounds: int) -> int:
+    """
+    Highest rounds value whose hash time stays within `target_ms`, clamped to [min_rounds, max_rounds].
+    Each extra round doubles the cost, so we stop as soon as the next one would overshoot.
+    """
+    rounds = min_rounds
+    elapsed = measure_hash_ms(rounds)
+    while rounds < max_rounds and elapsed * 2 <= target_ms:
+        rounds += 1
+        elapsed = measure_hash_ms(rounds)
+    if elapsed > target_ms and rounds > min_rounds:
+        rounds -= 1
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report bcrypt hash time per rounds value on this machine.")
+    parser.add_argument("--min-rounds", type=int, default=8)
+    parser.add_argument("--max-rounds", type=int, default=15)
+    parser.add_argument("--target-ms", type=float, default=None, help="also print the rounds value calibration would pick")
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6}  {'hash ms':>10}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        print(f"{rounds:>6}  {measure_hash_ms(rounds):>10.1f}")
+
+    if args.target_ms:
+        chosen = calibrate_rounds(args.target_ms, args.min_rounds, args.max_rounds)
+        print(f"\nCalibrated rounds for {args.target_ms:.0f} ms target: {chosen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import Generator
-from sqlalchemy import create_engine
+from typing import AsyncGenerator, Generator
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.core.settings import get_settings
 
 settings = get_settings()
@@ -11,6 +12,23 @@ engine = create_engine(
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine (aiosqlite) so async handlers never block the event loop on DB I/O
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URI)
+
+
+
+def _enable_wal(dbapi_connection, connection_record):
+    # WAL: readers (exports, listings) no longer block the writer and vice versa
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
+event.listen(engine, "connect", _enable_wal)
+event.listen(async_engine.sync_engine, "connect", _enable_wal)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
@@ -20,3 +38,8 @@ def get_session() -> Generator:
         yield session
     finally:
         session.close()
+
+
+async def get_async_session() -> AsyncGenerator:
+    async with AsyncSessionLocal() as session:
+        yield session
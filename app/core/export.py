@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def encode_records(records: Iterable[Dict], fmt: str, fieldnames: List[str], batch_size: int = 500) -> Iterator[bytes]:
+    """
+    Encode dict records lazily as NDJSON lines or CSV (header first), a few hundred per chunk,
+    so memory stays flat however many rows the source iterator yields.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore") if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+
+    pending = 0
+    for record in records:
+        if writer:
+            writer.writerow({key: _csv_value(value) for key, value in record.items()})
+        else:
+            buffer.write(json.dumps(record, default=_json_default, separators=(",", ":")))
+            buffer.write("\n")
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response  # type: ignore
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort: Optional[str], key: Any, row_id: int) -> str:
+    """Opaque cursor pointing just past a row: the sort it belongs to, the row's sort key and its id."""
+    raw = json.dumps([sort, key, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[str]) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order.")
+    return key, int(row_id)
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int, sort: Optional[str], sort_key) -> None:
+    # a full page means there may be more rows: hand out a cursor past the last one
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, sort_key(last), last.id)
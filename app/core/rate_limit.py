@@ -0,0 +1,93 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status  # type: ignore
+
+from app.core.logger import get_logger
+from app.core.settings import get_settings
+
+settings = get_settings()
+logger = get_logger("rate_limit")
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets; swap in a shared store (e.g. Redis) by implementing `acquire`."""
+
+    @abstractmethod
+    def acquire(self, key: str, rate_per_second: float, burst: int) -> float:
+        """Take one token from `key`'s bucket. Returns 0 if allowed, else seconds until a token is available."""
+
+
+class InMemoryTokenBucket(RateLimitBackend):
+    """Per-process token buckets, O(1) per call, LRU-evicted beyond `max_keys`."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str, rate_per_second: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate_per_second)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate_per_second
+        self._buckets[key] = (tokens, now)  # re-insert at the MRU end
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+rate_limit_backend: RateLimitBackend = InMemoryTokenBucket(settings.RATE_LIMIT_MAX_KEYS)
+
+
+async def _request_email(request: Request) -> Optional[str]:
+    # FastAPI has already read and cached the body by the time dependencies run
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/json"):
+            body = await request.json()
+            return body.get("email") if isinstance(body, dict) else None
+        if content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            form = await request.form()
+            return form.get("username") or form.get("email")
+    except Exception:
+        return None
+    return None
+
+
+class RateLimiter:
+    """
+    Router dependency throttling a scope per client IP and per email in the request body.
+    Raises 429 with Retry-After once a bucket is empty.
+    """
+
+    def __init__(self, scope: str):
+        self.scope = scope
+
+    async def __call__(self, request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        client_ip = request.client.host if request.client else "unknown"
+        self._check(f"{self.scope}:ip:{client_ip}", settings.RATE_LIMIT_IP_PER_MINUTE, settings.RATE_LIMIT_IP_BURST)
+
+        email = await _request_email(request)
+        if email:
+            self._check(f"{self.scope}:email:{str(email).lower()}", settings.RATE_LIMIT_EMAIL_PER_MINUTE, settings.RATE_LIMIT_EMAIL_BURST)
+
+    def _check(self, key: str, per_minute: int, burst: int):
+        if per_minute <= 0:  # 0 turns this limit off (and would otherwise divide by zero in acquire)
+            return
+        wait = rate_limit_backend.acquire(key, per_minute / 60, burst)
+        if wait:
+            logger.warning(f"Rate limit exceeded for {key}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
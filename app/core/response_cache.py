@@ -0,0 +1,81 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Bounded LRU of already-serialized response bodies with versioned invalidation.
+
+    Every entry is stamped with the version current when its query started; `invalidate()`
+    bumps the version so all older entries turn into misses (and a query racing a write
+    can never store a stale body under the new version). Shared by threadpool workers, hence the lock.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, bytes, Dict[str, str]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.version:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, key: Hashable, version: int, body: bytes, headers: Dict[str, str]) -> None:
+        with self._lock:
+            if version != self.version or len(body) > self.max_bytes:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (version, body, headers)
+            self._bytes += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, body, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            key_bytes = sum(sys.getsizeof(key) for key in self._entries)
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "body_bytes": self._bytes,
+                "approx_memory_bytes": self._bytes + key_bytes,
+                "max_bytes": self.max_bytes,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
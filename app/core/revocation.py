@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+
+class RevokedTokens:
+    """
+    In-memory denylist of revoked user_token ids for the stateless access-token mode.
+
+    An id only has to be remembered until every access token issued for it has expired,
+    i.e. ACCESS_TOKEN_EXPIRE_MINUTES after revocation, so the set stays small.
+    The list is per process: it is rebuilt from the DB at startup and fed by logout/refresh.
+    """
+
+    def __init__(self, ttl_minutes: int):
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self._revoked: Dict[int, datetime] = {}
+
+    def revoke(self, token_ids: Iterable[int]) -> None:
+        now = datetime.utcnow()
+        self._prune(now)
+        forget_at = now + self.ttl
+        for token_id in token_ids:
+            self._revoked[token_id] = forget_at
+
+    def is_revoked(self, token_id: int) -> bool:
+        forget_at = self._revoked.get(token_id)
+        return forget_at is not None and forget_at > datetime.utcnow()
+
+    def _prune(self, now: datetime) -> None:
+        for token_id in [token_id for token_id, forget_at in self._revoked.items() if forget_at <= now]:
+            del self._revoked[token_id]
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revoked_tokens = RevokedTokens(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
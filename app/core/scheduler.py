@@ -0,0 +1,22 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from app.core.logger import get_logger
+
+logger = get_logger("scheduler")
+
+
+async def run_periodically(name: str, interval_seconds: float, job: Callable[[], Awaitable[None]]):
+    """
+    Run `job` every `interval_seconds` until cancelled (started/cancelled from the app lifespan).
+    A failing run is logged and retried on the next tick.
+    """
+    logger.info(f"Background job '{name}' started (every {interval_seconds}s)")
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Background job '{name}' failed: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
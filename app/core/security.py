@@ -1,20 +1,30 @@
+import asyncio
+import hashlib
+import hmac
 import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from app.core import settings
 from fastapi import Depends, HTTPException # type: ignore
 from fastapi.security import OAuth2PasswordBearer # type: ignore
 import jwt # type: ignore
 from passlib.context import CryptContext# type: ignore
 import base64
-from sqlalchemy.orm import joinedload, Session # type: ignore
+from sqlalchemy import event, inspect, select, update # type: ignore
+from sqlalchemy.orm import Session, joinedload # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
 from datetime import datetime, timedelta
-from app.core.database import get_session
+from app.core.bcrypt_cost import calibrate_rounds
+from app.core.database import get_async_session
 from app.core.settings import get_settings
+from app.core.revocation import revoked_tokens
+from app.core.token_cache import CachedUser, token_cache
 from app.auth.models import User, UserToken
 
 settings = get_settings()
 
 
 SPECIAL_CHARACTERS = "!@#$%^&*()-_=+[]{}|;:',.<>?/~`"
+RECOMMENDED_BCRYPT_ROUNDS = 12  # passlib's default; cheaper costs are allowed for small hosts but logged
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -25,6 +35,68 @@ def hash_password(password):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password,hashed_password)
 
+def verify_and_update_password(plain_password, hashed_password):
+    # returns (valid, new_hash); new_hash is set when the stored hash doesn't match the current cost policy
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def configure_password_hashing():
+    """
+    Set the bcrypt cost for new hashes (calibrating it to BCRYPT_TARGET_MS when BCRYPT_ROUNDS is 0),
+    never below BCRYPT_MIN_ROUNDS.
+    Hashes weaker than this host's cost are rehashed on login; stronger ones (from a host that
+    calibrated higher) are left alone, so a stored cost only ratchets up instead of flipping on every
+    host or restart: each rehash bumps users.updated_at, which signs the verification and reset links.
+    """
+    if not settings.BCRYPT_ROUNDS:
+        settings.BCRYPT_ROUNDS = calibrate_rounds(settings.BCRYPT_TARGET_MS, settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS)
+        logging.info(f"Calibrated bcrypt rounds: {settings.BCRYPT_ROUNDS} (target {settings.BCRYPT_TARGET_MS}ms)")
+    rounds = max(settings.BCRYPT_ROUNDS, settings.BCRYPT_MIN_ROUNDS)
+    if rounds < RECOMMENDED_BCRYPT_ROUNDS:
+        logging.warning(f"bcrypt rounds {rounds} are below the recommended {RECOMMENDED_BCRYPT_ROUNDS}: "
+                        f"raise BCRYPT_TARGET_MS or BCRYPT_MIN_ROUNDS once the host allows it")
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+def _create_hash_executor() -> Executor:
+    if settings.PASSWORD_HASH_EXECUTOR == "process":
+        return ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+hash_executor = _create_hash_executor()
+_hash_jobs_in_flight = 0
+
+
+async def _run_in_hash_pool(func, *args):
+    # bcrypt is deliberately slow; keep it off the event loop and shed load once the pool's queue is full
+    global _hash_jobs_in_flight
+    if _hash_jobs_in_flight >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE:
+        logging.warning("Password hashing pool saturated, rejecting request.")
+        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly.",
+                            headers={"Retry-After": "1"})
+    _hash_jobs_in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, func, *args)
+    finally:
+        _hash_jobs_in_flight -= 1
+
+
+async def hash_password_async(password):
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password, hashed_password):
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
+def shutdown_hash_executor():
+    hash_executor.shutdown(wait=False, cancel_futures=True)
+
 def is_password_strong_enough(password: str)-> bool:
     if len(password)<8:
         return False
@@ -66,33 +138,99 @@ def generate_token(payload: dict, secret: str, algo: str, expiry: timedelta):
     return jwt.encode(payload, secret, algorithm=algo)
 
 
-async def get_token_user(token: str, db):
+def _sign(message: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode('ascii').rstrip("=")
+
+
+def generate_signed_token(user_id: int, context_string: str, expiry: timedelta) -> str:
+    # one-time link token: HMAC over user id, expiry and the user's context string,
+    # so it stops verifying as soon as password/updated_at change
+    expires = int((datetime.utcnow() + expiry).timestamp())
+    signature = _sign(f"{user_id}.{expires}.{context_string}")
+    return f"{user_id}.{expires}.{signature}"
+
+
+def verify_signed_token(token: str, user_id: int, context_string: str) -> bool:
+    try:
+        token_user_id, expires, signature = token.split(".")
+        if int(token_user_id) != user_id or int(expires) < datetime.utcnow().timestamp():
+            return False
+    except (AttributeError, ValueError):
+        return False
+    return hmac.compare_digest(signature, _sign(f"{user_id}.{expires}.{context_string}"))
+
+
+async def get_token_user(token: str, db: AsyncSession):
     payload = get_token_payload(token, settings.JWT_SECRET, settings.JWT_ALGORITHM)
     if payload:
         user_token_id = str_decode(payload.get('r'))
         user_id = str_decode(payload.get('sub'))
         access_key = payload.get('a')
-        user_token = db.query(UserToken).options(joinedload(UserToken.user)).filter(UserToken.access_key == access_key,
+        if settings.AUTH_TOKEN_MODE == "stateless" and payload.get('e'):
+            # trust signature + expiry, no DB round trip
+            if revoked_tokens.is_revoked(int(user_token_id)):
+                return None
+            return CachedUser(id=int(user_id), name=str_decode(payload.get('n')), email=payload.get('e'),
+                              role=payload.get('role'), is_active=True, verified_at=None, created_at=None)
+        cached_user = token_cache.get(int(user_token_id), access_key)
+        if cached_user and str(cached_user.id) == user_id:
+            return cached_user
+        result = await db.execute(select(UserToken).options(joinedload(UserToken.user)).where(UserToken.access_key == access_key,
                                                  UserToken.id == user_token_id,
                                                  UserToken.user_id == user_id,
                                                  UserToken.expires_at > datetime.utcnow()
-                                                 ).first()
-        if user_token:
-            return user_token.user
+                                                 ))
+        user_token = result.scalars().first()
+        if user_token and user_token.user.is_active:
+            return token_cache.set(user_token.id, access_key, user_token.user, user_token.expires_at)
     return None
 
 
-async def load_user(email: str, db):
+def _expire_tokens_on_access_change(session: Session, flush_context):
+    # deactivating a user or changing their role ends their sessions: the token rows expire in the same
+    # transaction, the cache and the stateless denylist follow once it commits (raw SQL updates bypass this)
+    user_ids = [user.id for user in session.dirty if isinstance(user, User) and (
+        inspect(user).attrs.is_active.history.has_changes() or inspect(user).attrs.role.history.has_changes()
+    )]
+    if not user_ids:
+        return
+    now = datetime.utcnow()
+    token_ids = session.connection().execute(update(UserToken).where(
+        UserToken.user_id.in_(user_ids), UserToken.expires_at > now
+    ).values(expires_at=now).returning(UserToken.id)).scalars().all()
+    session.info.setdefault("revoked_users", set()).update(user_ids)
+    session.info.setdefault("revoked_tokens", set()).update(token_ids)
+
+
+def _apply_token_revocations(session: Session):
+    for user_id in session.info.pop("revoked_users", ()):
+        token_cache.invalidate_user(user_id)
+    revoked_tokens.revoke(session.info.pop("revoked_tokens", ()))
+
+
+def _discard_token_revocations(session: Session):
+    session.info.pop("revoked_users", None)
+    session.info.pop("revoked_tokens", None)
+
+
+event.listen(Session, "after_flush", _expire_tokens_on_access_change)
+event.listen(Session, "after_commit", _apply_token_revocations)
+event.listen(Session, "after_rollback", _discard_token_revocations)
+
+
+async def load_user(email: str, db: AsyncSession):
     from app.auth.models import User
     try:
-        user = db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
     except Exception as user_exec:
         logging.info(f"User Not Found, Email: {email}")
         user = None
     return user
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_session)):
     user = await get_token_user(token=token, db=db)
     if user:
         return user
@@ -59,6 +59,7 @@ class Settings(BaseSettings):
     # SQLite Database Config
     SQLITE_DB_FILE: str = os.getenv("SQLITE_DB_FILE", "app.db")
     DATABASE_URI: str = f"sqlite:///{SQLITE_DB_FILE}"
+    ASYNC_DATABASE_URI: str = f"sqlite+aiosqlite:///{SQLITE_DB_FILE}"
 
     # Mailpit (local SMTP dev) Config
     MAIL_SERVER: str = os.getenv("MAIL_SERVER", "localhost")
@@ -82,6 +83,76 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = os.getenv("ACCESS_TOKEN_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 3))
     REFRESH_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 1440))
+    VERIFY_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("VERIFY_TOKEN_EXPIRE_MINUTES", 1440))
+    RESET_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("RESET_TOKEN_EXPIRE_MINUTES", 15))
+
+    # "db" re-checks the user_tokens row on every request, "stateless" trusts the JWT
+    # signature/expiry and only consults the in-memory revocation list
+    AUTH_TOKEN_MODE: str = os.getenv("AUTH_TOKEN_MODE", "db")
+
+    # Access-token validation cache
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+
+    # Expired user_tokens sweeper
+    TOKEN_REAPER_INTERVAL_SECONDS: int = int(os.getenv("TOKEN_REAPER_INTERVAL_SECONDS", 300))
+    TOKEN_REAPER_BATCH_SIZE: int = int(os.getenv("TOKEN_REAPER_BATCH_SIZE", 500))
+
+    # bcrypt cost: BCRYPT_ROUNDS=0 calibrates at startup to BCRYPT_TARGET_MS within [MIN, MAX];
+    # stored hashes below the resulting cost are upgraded on login, anything under 12 is logged as a warning
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 0))
+    BCRYPT_TARGET_MS: float = float(os.getenv("BCRYPT_TARGET_MS", 250))
+    BCRYPT_MIN_ROUNDS: int = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+    BCRYPT_MAX_ROUNDS: int = int(os.getenv("BCRYPT_MAX_ROUNDS", 14))
+
+    # Auth endpoint throttling (token buckets per client IP and per email; a PER_MINUTE of 0 disables that limit)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_IP_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_IP_PER_MINUTE", 30))
+    RATE_LIMIT_IP_BURST: int = int(os.getenv("RATE_LIMIT_IP_BURST", 10))
+    RATE_LIMIT_EMAIL_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_EMAIL_PER_MINUTE", 5))
+    RATE_LIMIT_EMAIL_BURST: int = int(os.getenv("RATE_LIMIT_EMAIL_BURST", 5))
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+
+    # Public catalog listing result cache
+    CATALOG_CACHE_MAX_ENTRIES: int = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 5000))
+    CATALOG_CACHE_MAX_BYTES: int = int(os.getenv("CATALOG_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    # Default price histogram for /public/products/facets
+    FACET_PRICE_BUCKET_WIDTH: float = float(os.getenv("FACET_PRICE_BUCKET_WIDTH", 50))
+    FACET_PRICE_BUCKETS: int = int(os.getenv("FACET_PRICE_BUCKETS", 10))
+
+    # Public listing engine: "sql" or "columnar" (NumPy snapshot of the catalog, needs numpy installed)
+    CATALOG_ENGINE: str = os.getenv("CATALOG_ENGINE", "sql")
+
+    # Max ids per /public/products/batch lookup
+    PRODUCT_BATCH_MAX_IDS: int = int(os.getenv("PRODUCT_BATCH_MAX_IDS", 200))
+
+    # Typeahead suggestions: trigram share needed for a fuzzy match, trigrams in more terms than this are not indexed
+    SUGGEST_MIN_SIMILARITY: float = float(os.getenv("SUGGEST_MIN_SIMILARITY", 0.4))
+    SUGGEST_MAX_POSTINGS: int = int(os.getenv("SUGGEST_MAX_POSTINGS", 5000))
+
+    # Streaming bulk product import
+    PRODUCT_IMPORT_BATCH_SIZE: int = int(os.getenv("PRODUCT_IMPORT_BATCH_SIZE", 1000))
+    PRODUCT_IMPORT_MAX_ERRORS: int = int(os.getenv("PRODUCT_IMPORT_MAX_ERRORS", 1000))
+
+    # Streaming exports: rows (orders, for the order export) read per keyset chunk, one short transaction each
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+    # Cart storage: "sql" (write-through) or "memory" (write-behind, single worker only; see app/cart/store.py)
+    CART_STORE: str = os.getenv("CART_STORE", "sql")
+    CART_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("CART_FLUSH_INTERVAL_SECONDS", 2))
+    CART_FLUSH_BATCH_USERS: int = int(os.getenv("CART_FLUSH_BATCH_USERS", 200))
+    CART_STORE_MAX_USERS: int = int(os.getenv("CART_STORE_MAX_USERS", 100000))
+
+    # Abandoned-cart sweeper: lines untouched for CART_TTL_DAYS are deleted (0, the default, disables it: opt in)
+    CART_TTL_DAYS: float = float(os.getenv("CART_TTL_DAYS", 0))
+    CART_SWEEPER_INTERVAL_SECONDS: int = int(os.getenv("CART_SWEEPER_INTERVAL_SECONDS", 3600))
+    CART_SWEEPER_BATCH_SIZE: int = int(os.getenv("CART_SWEEPER_BATCH_SIZE", 500))
+
+    # Password hashing worker pool ("thread" or "process")
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
 
 @lru_cache()
 def get_settings() -> Settings:
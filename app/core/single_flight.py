@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs `fn`,
+    callers arriving while it is in flight block and receive the same result (or exception).
+    Thread-based because the sync routes it fronts run in FastAPI's threadpool.
+    """
+
+    def __init__(self, max_tracked_keys: int = 1000):
+        self.max_tracked_keys = max_tracked_keys
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._key_metrics: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        started = time.perf_counter()
+        call.done.wait()
+        self._record_wait(key, (time.perf_counter() - started) * 1000)
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _record_wait(self, key: Hashable, waited_ms: float) -> None:
+        name = str(key)
+        with self._lock:
+            metrics = self._key_metrics.pop(name, None) or {"waits": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+            metrics["waits"] += 1
+            metrics["total_wait_ms"] += waited_ms
+            metrics["max_wait_ms"] = max(metrics["max_wait_ms"], waited_ms)
+            self._key_metrics[name] = metrics
+            if len(self._key_metrics) > self.max_tracked_keys:
+                self._key_metrics.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "keys": {
+                    name: {
+                        "waits": int(m["waits"]),
+                        "avg_wait_ms": round(m["total_wait_ms"] / m["waits"], 3),
+                        "max_wait_ms": round(m["max_wait_ms"], 3),
+                    }
+                    for name, m in self._key_metrics.items()
+                },
+            }
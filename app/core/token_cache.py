@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CachedUser:  # detached snapshot of the caller, safe to share across requests/sessions
+    id: int
+    name: str
+    email: str
+    role: str
+    is_active: bool
+    verified_at: Optional[datetime]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user) -> "CachedUser":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            verified_at=user.verified_at,
+            created_at=user.created_at,
+        )
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of resolved access tokens keyed by (user_token id, access_key).
+
+    Entries live until the token row's `expires_at` (capped at `ttl_seconds`) and are
+    dropped explicitly on logout / refresh so revocation takes effect immediately.
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[CachedUser, datetime]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token_id: int, access_key: str) -> Optional[CachedUser]:
+        key = (token_id, access_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, expires_at = entry
+        if expires_at <= datetime.utcnow():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+
+    def set(self, token_id: int, access_key: str, user, expires_at: datetime) -> CachedUser:
+        snapshot = user if isinstance(user, CachedUser) else CachedUser.from_user(user)
+        if self.max_size <= 0:
+            return snapshot
+        key = (token_id, access_key)
+        self._entries[key] = (snapshot, min(expires_at, datetime.utcnow() + self.ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return snapshot
+
+    def invalidate(self, token_id: int, access_key: str) -> None:
+        self._entries.pop((token_id, access_key), None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        for key in [key for key, (user, _) in self._entries.items() if user.id == user_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_MAX_SIZE, settings.TOKEN_CACHE_TTL_SECONDS)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, Float, Enum, ForeignKey, DateTime,String
+from sqlalchemy import Column, Index, Integer, Float, Enum, ForeignKey, DateTime,String
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
@@ -18,6 +18,11 @@ class Order(Base):
     total_amount = Column(Float, nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.pending, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, nullable=False, server_default="1")
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (Index('ix_orders_user_id_id', 'user_id', 'id'),)  # per-user order history, newest first
+    __mapper_args__ = {"version_id_col": version}
 
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete")
@@ -1,12 +1,18 @@
 from app.auth.models import User
-from app.core.security import user_required
+from app.core.security import admin_required, user_required
 from app.orders.schemas import OrderResponse, OrderSummary
-from app.orders.services import get_all_orders_for_user, get_order_by_id
-from fastapi import APIRouter, Depends, status, HTTPException
+from app.orders.services import (ORDER_EXPORT_FIELDS, get_all_orders_for_user, get_order_by_id, get_order_version,
+                                 get_orders_state, iter_orders_for_export)
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import List, Optional
 
+from app.core.conditional import is_not_modified, make_etag, not_modified, validator_headers
 from app.core.database import get_session
+from app.core.export import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, encode_records
+from app.core.pagination import set_next_cursor
 
 
 order_router = APIRouter(prefix="/orders", tags=["Orders"],
@@ -14,17 +20,54 @@ order_router = APIRouter(prefix="/orders", tags=["Orders"],
 
 @order_router.get("", response_model=List[OrderSummary])
 def get_orders(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     session: Session = Depends(get_session), 
     current_user:User=Depends(user_required)
     ):
-    return  get_all_orders_for_user(session, current_user.id)
+    count, version_sum, max_id, last_modified = get_orders_state(session, current_user.id)
+    etag = make_etag("orders", current_user.id, count, version_sum, max_id, skip, limit, cursor)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    orders = get_all_orders_for_user(session, current_user.id, skip, limit, cursor)
+    set_next_cursor(response, orders, limit, None, lambda order: None)
+    response.headers.update(validator_headers(etag, last_modified))
+    return orders
+
+@order_router.get("/export")
+def export_orders(
+    format: str = Query("ndjson", description="ndjson (one order with its items per line) or csv (one row per item)"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(admin_required)
+    ):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format must be ndjson or csv")
+    records = iter_orders_for_export(start_date, end_date, nested=format == "ndjson")
+    return StreamingResponse(
+        encode_records(records, format, ORDER_EXPORT_FIELDS),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
 
 @order_router.get("/{order_id}", response_model=OrderResponse)
 def get_order_detail(
     order_id: int, 
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session), 
     current_user:User=Depends(user_required)
     ):
+    version = get_order_version(session, order_id, current_user.id)
+    if version:
+        etag = make_etag("order", order_id, version.version)
+        if is_not_modified(request, etag, version.updated_at):
+            return not_modified(etag, version.updated_at)
+        response.headers.update(validator_headers(etag, version.updated_at))
     order = get_order_by_id(session, order_id, current_user.id)
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
@@ -1,18 +1,37 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
 from fastapi import HTTPException
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.orders.models import Order
+from app.orders.models import Order, OrderItem
+from app.core.database import SessionLocal
 from app.core.logger import get_logger
+from app.core.settings import get_settings
+from app.core.pagination import decode_cursor
 
 logger = get_logger("orders")
+settings = get_settings()
 
+ORDER_EXPORT_FIELDS = ["order_id", "user_id", "status", "total_amount", "created_at",
+                       "product_id", "product_name", "product_description", "quantity", "price_at_purchase"]
+ORDER_ITEM_EXPORT_FIELDS = ORDER_EXPORT_FIELDS[5:]
 
-def get_all_orders_for_user(session: Session, user_id: int) -> List[Order]:
+
+def get_all_orders_for_user(session: Session, user_id: int, skip: int = 0, limit: int = 20,
+                            cursor: Optional[str] = None) -> List[Order]:
     try:
-        orders = session.query(Order).filter(Order.user_id == user_id).all()
+        # newest first; id is monotonic with created_at so it doubles as the keyset
+        query = session.query(Order).filter(Order.user_id == user_id).order_by(Order.id.desc())
+        if cursor:
+            _, last_id = decode_cursor(cursor, None)
+            query = query.filter(Order.id < last_id)
+            skip = 0
+        orders = query.offset(skip).limit(limit).all()
         logger.info(f"Fetched {len(orders)} orders for user_id={user_id}")
         return orders
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         logger.error(f"Error fetching orders for user_id={user_id}: {e}", exc_info=True)
         raise HTTPException(
@@ -21,6 +40,17 @@ def get_all_orders_for_user(session: Session, user_id: int) -> List[Order]:
         )
 
 
+def get_orders_state(session: Session, user_id: int):
+    # count/version sum/max id change on any insert, update or delete of the user's orders
+    return session.query(
+        func.count(Order.id), func.sum(Order.version), func.max(Order.id), func.max(Order.updated_at)
+    ).filter(Order.user_id == user_id).one()
+
+
+def get_order_version(session: Session, order_id: int, user_id: int):
+    return session.query(Order.version, Order.updated_at).filter(Order.id == order_id, Order.user_id == user_id).first()
+
+
 def get_order_by_id(session: Session, order_id: int, user_id: int) -> Order:
     try:
         order = session.query(Order).filter(Order.id == order_id, Order.user_id == user_id).first()
@@ -40,3 +70,51 @@ def get_order_by_id(session: Session, order_id: int, user_id: int) -> Order:
             status_code=500,
             detail="Failed to retrieve the order"
         )
+
+
+def iter_orders_for_export(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                           nested: bool = True) -> Iterator[dict]:
+    """
+    Orders joined with their items, EXPORT_BATCH_SIZE orders per keyset chunk.
+    nested=True yields one record per order with an "items" list (rows arrive grouped by order id),
+    nested=False yields one flat record per order item (CSV).
+    """
+    orders = select(Order.id).order_by(Order.id).limit(settings.EXPORT_BATCH_SIZE)
+    if start_date:
+        orders = orders.where(Order.created_at >= start_date)
+    if end_date:
+        orders = orders.where(Order.created_at <= end_date)
+    query = select(
+        Order.id.label("order_id"), Order.user_id, Order.status, Order.total_amount, Order.created_at,
+        OrderItem.product_id, OrderItem.product_name, OrderItem.product_description,
+        OrderItem.quantity, OrderItem.price_at_purchase
+    ).outerjoin(OrderItem, OrderItem.order_id == Order.id).order_by(Order.id, OrderItem.id)
+
+    last_id = 0
+    while True:
+        # own short session per chunk: the request-scoped one is closed before a StreamingResponse
+        # body is sent, and one long read transaction would pin the database for the whole stream
+        with SessionLocal() as session:
+            order_ids = session.execute(orders.where(Order.id > last_id)).scalars().all()
+            rows = session.execute(query.where(Order.id.in_(order_ids))).all() if order_ids else []
+
+        if not nested:
+            for row in rows:
+                yield row._asdict()
+        else:
+            current = None
+            for row in rows:
+                record = row._asdict()
+                if current is None or current["id"] != record["order_id"]:
+                    if current is not None:
+                        yield current
+                    current = {"id": record["order_id"], "user_id": record["user_id"], "status": record["status"],
+                               "total_amount": record["total_amount"], "created_at": record["created_at"], "items": []}
+                if record["quantity"] is not None:
+                    current["items"].append({field: record[field] for field in ORDER_ITEM_EXPORT_FIELDS})
+            if current is not None:
+                yield current  # chunks hold whole orders, so an order never spans two chunks
+
+        if len(order_ids) < settings.EXPORT_BATCH_SIZE:
+            return
+        last_id = order_ids[-1]
@@ -0,0 +1,11 @@
+from app.core.response_cache import ResponseCache
+from app.core.single_flight import SingleFlight
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+# serialized /public/products pages; invalidated by every product write
+catalog_cache = ResponseCache(settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_MAX_BYTES)
+
+# coalesces concurrent identical listing/search queries into one DB execution
+catalog_flights = SingleFlight()
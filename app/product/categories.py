@@ -0,0 +1,75 @@
+import re
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.logger import get_logger
+from app.product.models import Category, CategoryClosure
+
+logger = get_logger("product")
+
+
+def slugify(name: str) -> str:
+    slug = "-".join(re.findall(r"[a-z0-9]+", name.lower()))
+    return slug or name.strip().lower()
+
+
+def category_ids(session: Session, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Map free-text category names to taxonomy ids, creating any missing ones as top-level
+    categories. Works inside the caller's transaction (flush only, no commit).
+    """
+    slugs = {name: slugify(name) for name in names}
+    if not slugs:
+        return {}
+    existing = dict(session.execute(
+        select(Category.slug, Category.id).where(Category.slug.in_(set(slugs.values())))
+    ).all())
+    for name, slug in slugs.items():
+        if slug not in existing:
+            existing[slug] = _insert_category(session, name.strip(), slug, None)
+    return {name: existing[slug] for name, slug in slugs.items()}
+
+
+def create_category(session: Session, name: str, parent_id: Optional[int]) -> Category:
+    slug = slugify(name)
+    if session.query(Category.id).filter(Category.slug == slug).first():
+        raise HTTPException(status_code=400, detail="Category already exists")
+    if parent_id is not None and not session.get(Category, parent_id):
+        raise HTTPException(status_code=404, detail="Parent category not found")
+    category_id = _insert_category(session, name.strip(), slug, parent_id)
+    session.commit()
+    logger.info(f"Category created: {slug} (parent {parent_id})")
+    return session.get(Category, category_id)
+
+
+def _insert_category(session: Session, name: str, slug: str, parent_id: Optional[int]) -> int:
+    category_id = session.execute(
+        insert(Category).values(name=name, slug=slug, parent_id=parent_id).returning(Category.id)
+    ).scalar_one()
+    # closure rows: itself at depth 0 plus every ancestor of the parent one level further down
+    session.execute(insert(CategoryClosure).values(ancestor_id=category_id, descendant_id=category_id, depth=0))
+    if parent_id is not None:
+        session.execute(insert(CategoryClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(CategoryClosure.ancestor_id, literal(category_id), CategoryClosure.depth + 1)
+            .where(CategoryClosure.descendant_id == parent_id)
+        ))
+    return category_id
+
+
+def resolve_category(session: Session, category_id: Optional[int], category_slug: Optional[str]) -> Optional[int]:
+    """Category id for an id or slug filter; -1 when the slug is unknown (matches nothing)."""
+    if category_id is not None:
+        return category_id
+    if category_slug:
+        found = session.query(Category.id).filter(Category.slug == slugify(category_slug)).scalar()
+        return found if found is not None else -1
+    return None
+
+
+def descendant_ids(category_id: int):
+    # subquery over the closure primary key: the category and all of its descendants
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
@@ -0,0 +1,181 @@
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.logger import get_logger
+from app.core.settings import get_settings
+from app.product.facets import _catalog_version
+from app.product.models import Product
+
+try:
+    import numpy as np
+except ImportError:  # optional: only CATALOG_ENGINE=columnar needs it
+    np = None
+
+logger = get_logger("product")
+settings = get_settings()
+
+CATALOG_ENGINES = ("sql", "columnar")
+
+
+class ColumnarCatalog:
+    """
+    Columnar snapshot of the catalog for the public listing: NumPy arrays of id/price/stock,
+    categories dictionary-encoded as int32 codes, names as an object array (for name sort).
+
+    Rows are kept in id order, so a stable argsort on price or name already breaks ties
+    by id like the SQL ORDER BY does; those sort permutations are cached until the next write.
+    A listing is boolean masks over the columns, one pass over the cached permutation and a
+    slice; only the ids of the page are hydrated from the DB.
+    `version` tracks catalog_state.version exactly like CatalogFacets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = -1
+        self._orders: Dict[str, "np.ndarray"] = {}
+        if np is not None:
+            self._reset()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CATALOG_ENGINE == "columnar" and np is not None
+
+    def _reset(self) -> None:
+        self._ids = np.empty(0, dtype=np.int64)
+        self._prices = np.empty(0, dtype=np.float64)
+        self._stock = np.empty(0, dtype=np.int32)
+        self._category_codes = np.empty(0, dtype=np.int32)
+        self._names = np.empty(0, dtype=object)
+        self._categories: List[str] = []
+        self._category_index: Dict[str, int] = {}
+        self._orders = {}
+
+    def rebuild(self, session: Session) -> None:
+        with self._lock:
+            self._rebuild(session)
+
+    def _rebuild(self, session: Session) -> None:
+        version = _catalog_version(session)
+        self._reset()
+        ids, prices, stock, codes, names = [], [], [], [], []
+        query = session.query(Product.id, Product.price, Product.stock, Product.category, Product.name)
+        for product_id, price, quantity, category, name in query.order_by(Product.id).yield_per(10000):
+            ids.append(product_id)
+            prices.append(price)
+            stock.append(quantity)
+            codes.append(self._category_code(category))
+            names.append(name)
+        self._ids = np.array(ids, dtype=np.int64)
+        self._prices = np.array(prices, dtype=np.float64)
+        self._stock = np.array(stock, dtype=np.int32)
+        self._category_codes = np.array(codes, dtype=np.int32)
+        self._names = np.empty(len(names), dtype=object)
+        self._names[:] = names
+        self.version = version
+        logger.info(f"Columnar catalog rebuilt: {len(self._ids)} products, "
+                    f"{len(self._categories)} categories (catalog version {version})")
+
+    def apply(self, session: Session, product_id: int, product: Optional[Product] = None) -> None:
+        """Apply one committed write (product=None means deleted); called by the product services after commit."""
+        if not self.enabled:
+            return
+        with self._lock:
+            version = _catalog_version(session)
+            if self.version < 0 or version != self.version + 1:
+                self.version = -1  # someone else wrote in between: rebuild on next read
+                return
+            index = int(np.searchsorted(self._ids, product_id))
+            exists = index < len(self._ids) and self._ids[index] == product_id
+            if product is None:
+                if exists:
+                    self._ids = np.delete(self._ids, index)
+                    self._prices = np.delete(self._prices, index)
+                    self._stock = np.delete(self._stock, index)
+                    self._category_codes = np.delete(self._category_codes, index)
+                    self._names = np.delete(self._names, index)
+            elif exists:
+                self._prices[index] = product.price
+                self._stock[index] = product.stock
+                self._category_codes[index] = self._category_code(product.category)
+                self._names[index] = product.name
+            else:
+                self._ids = np.insert(self._ids, index, product_id)
+                self._prices = np.insert(self._prices, index, product.price)
+                self._stock = np.insert(self._stock, index, product.stock)
+                self._category_codes = np.insert(self._category_codes, index, self._category_code(product.category))
+                names = np.empty(len(self._names) + 1, dtype=object)
+                names[:index], names[index], names[index + 1:] = self._names[:index], product.name, self._names[index:]
+                self._names = names
+            self._orders = {}
+            self.version = version
+
+    def list_product_ids(
+        self,
+        session: Session,
+        category: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        sort_by: Optional[str],
+        skip: int,
+        limit: int,
+        after: Optional[tuple] = None
+    ) -> List[int]:
+        """Ids of one listing page, same semantics as the SQL path; `after` is a decoded (sort key, id) cursor."""
+        with self._lock:
+            if self.version != _catalog_version(session):
+                self._rebuild(session)
+
+            mask = np.ones(len(self._ids), dtype=bool)
+            if category:
+                # ILIKE '%x%' evaluated once per distinct category, then a vectorized code lookup
+                needle = category.lower()
+                codes = [code for code, name in enumerate(self._categories) if needle in name.lower()]
+                mask &= np.isin(self._category_codes, codes)
+            if min_price is not None:
+                mask &= self._prices >= min_price
+            if max_price is not None:
+                mask &= self._prices <= max_price
+
+            if after:
+                key, last_id = after
+                if sort_by == "price_asc":
+                    mask &= (self._prices > key) | ((self._prices == key) & (self._ids > last_id))
+                elif sort_by == "price_desc":
+                    mask &= (self._prices < key) | ((self._prices == key) & (self._ids < last_id))
+                elif sort_by == "name":
+                    mask &= (self._names > key) | ((self._names == key) & (self._ids > last_id))
+                else:
+                    mask &= self._ids > last_id
+                skip = 0
+
+            order = self._order(sort_by)
+            rows = np.flatnonzero(mask) if order is None else order[mask[order]]
+            return self._ids[rows[skip:skip + limit]].tolist()
+
+    def _order(self, sort_by: Optional[str]):
+        if sort_by is None:
+            return None  # already in id order
+        if sort_by not in self._orders:
+            if sort_by == "name":
+                order = np.argsort(self._names, kind="stable")
+            else:
+                order = np.argsort(self._prices, kind="stable")
+            # price_desc is ORDER BY price DESC, id DESC: the exact reverse of (price, id) ascending
+            self._orders[sort_by] = order[::-1] if sort_by == "price_desc" else order
+        return self._orders[sort_by]
+
+    def _category_code(self, category: str) -> int:
+        code = self._category_index.get(category)
+        if code is None:
+            code = len(self._categories)
+            self._category_index[category] = code
+            self._categories.append(category)
+        return code
+
+
+if settings.CATALOG_ENGINE == "columnar" and np is None:
+    logger.warning("CATALOG_ENGINE=columnar needs numpy (pip install numpy); falling back to SQL listings")
+
+catalog_columns = ColumnarCatalog()
@@ -0,0 +1,131 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from math import floor
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.logger import get_logger
+from app.product.categories import descendant_ids, resolve_category
+from app.product.models import CatalogState, Product
+
+logger = get_logger("product")
+
+
+class CatalogFacets:
+    """
+    In-memory facet summary: one sorted array of prices per category name and taxonomy id
+    (8 bytes/product), so both the name filter and the taxonomy filter of the listing apply.
+
+    Category counts and histogram buckets are bisections, so a summary costs
+    O(categories x buckets x log n) no matter how many products match.
+    `version` mirrors catalog_state.version; product writes in this process apply their
+    delta, anything else (other workers, bulk loads) makes the versions diverge and the
+    next read rebuilds from the DB.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prices: Dict[Tuple[str, Optional[int]], array] = {}
+        self.version = -1
+
+    def rebuild(self, session: Session) -> None:
+        with self._lock:
+            self._rebuild(session)
+
+    def _rebuild(self, session: Session) -> None:
+        version = _catalog_version(session)
+        prices: Dict[Tuple[str, Optional[int]], list] = {}
+        for category, category_id, price in session.query(Product.category, Product.category_id, Product.price).yield_per(10000):
+            prices.setdefault((category, category_id), []).append(price)
+        self._prices = {key: array("d", sorted(values)) for key, values in prices.items()}
+        self.version = version
+        logger.info(f"Facet index rebuilt: {sum(len(p) for p in self._prices.values())} products, "
+                    f"{len({category for category, _ in self._prices})} categories (catalog version {version})")
+
+    def apply(self, session: Session, removed: Optional[Tuple[str, Optional[int], float]] = None,
+              added: Optional[Tuple[str, Optional[int], float]] = None) -> None:
+        """Apply one committed product write as (category, category_id, price); called by the product services after commit."""
+        with self._lock:
+            version = _catalog_version(session)
+            if self.version < 0 or version != self.version + 1:
+                self.version = -1  # someone else wrote in between: rebuild on next read
+                return
+            if removed:
+                key, price = removed[:2], removed[2]
+                prices = self._prices.get(key)
+                if prices is not None:
+                    index = bisect_left(prices, price)
+                    if index < len(prices) and prices[index] == price:
+                        del prices[index]
+                    if not prices:
+                        del self._prices[key]
+            if added:
+                insort(self._prices.setdefault(added[:2], array("d")), added[2])
+            self.version = version
+
+    def summary(self, session: Session, category: Optional[str], min_price: Optional[float],
+                max_price: Optional[float], bucket_width: float, buckets: int,
+                category_id: Optional[int] = None, category_slug: Optional[str] = None) -> dict:
+        with self._lock:
+            if self.version != _catalog_version(session):
+                self._rebuild(session)
+
+            # same category semantics as list_products_service: case-insensitive substring,
+            # and the taxonomy filter covers the category and all of its descendants
+            needle = category.lower() if category else None
+            taxonomy_id = resolve_category(session, category_id, category_slug)
+            taxonomy: Optional[Set[int]] = None
+            if taxonomy_id is not None:
+                taxonomy = set(session.execute(descendant_ids(taxonomy_id)).scalars())
+            selected = {
+                key: prices for key, prices in self._prices.items()
+                if (not needle or needle in key[0].lower()) and (taxonomy is None or key[1] in taxonomy)
+            }
+
+            counts: Dict[str, int] = {}
+            for (name, _), prices in selected.items():
+                counts[name] = counts.get(name, 0) + _range_count(prices, min_price, max_price, True)
+            categories = sorted(
+                ({"category": name, "count": count} for name, count in counts.items() if count),
+                key=lambda c: (-c["count"], c["category"])
+            )
+
+            histogram: List[dict] = []
+            lowest = min_price if min_price is not None else min((p[0] for p in selected.values() if p), default=0.0)
+            start = floor(lowest / bucket_width) * bucket_width
+            for i in range(buckets):
+                low = start + i * bucket_width
+                high, inclusive, final = low + bucket_width, False, False
+                if (max_price is not None and high >= max_price) or i == buckets - 1:
+                    # close on the upper filter, or leave the last bucket open-ended
+                    high, inclusive, final = max_price, True, True
+                effective_low = max(low, min_price) if min_price is not None else low
+                bucket_count = sum(_range_count(prices, effective_low, high, inclusive) for prices in selected.values())
+                histogram.append({"min": effective_low, "max": high, "count": bucket_count})
+                if final:
+                    break
+
+            return {
+                "total": sum(c["count"] for c in categories),
+                "categories": categories,
+                "price_histogram": histogram,
+            }
+
+
+def _range_count(prices: array, low: Optional[float], high: Optional[float], high_inclusive: bool) -> int:
+    start = bisect_left(prices, low) if low is not None else 0
+    if high is None:
+        end = len(prices)
+    else:
+        end = bisect_right(prices, high) if high_inclusive else bisect_left(prices, high)
+    return max(0, end - start)
+
+
+def _catalog_version(session: Session) -> int:
+    version = session.query(CatalogState.version).filter(CatalogState.id == 1).scalar()
+    return version or 0
+
+
+catalog_facets = CatalogFacets()
@@ -0,0 +1,159 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal
+from app.core.logger import get_logger
+from app.core.settings import get_settings
+from app.product.cache import catalog_cache
+from app.product.categories import category_ids
+from app.product.models import Product
+from app.product.schemas import ProductCreate
+from app.product.services import check_product_fields
+
+settings = get_settings()
+logger = get_logger("product")
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+async def _records(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple]:
+    """
+    Yield (row_number, raw_record) from the upload as it arrives; only the current
+    network chunk and one partial line are ever held in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    header = None
+    row_number = 0
+
+    async def lines():
+        nonlocal pending
+        async for chunk in stream:
+            pending += decoder.decode(chunk)
+            *complete, pending = pending.split("\n")
+            for line in complete:
+                yield line
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+
+    record = ""
+    async for line in lines():
+        if fmt == "ndjson":
+            if line.strip():
+                row_number += 1
+                yield row_number, line
+            continue
+
+        # CSV: a quoted field may span lines, a record is complete once its quotes balance
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        line, record = record, ""
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        yield row_number, dict(zip(header, values))
+    if record:
+        row_number += 1
+        yield row_number, ValueError("Unterminated quoted field")
+
+
+def _parse(raw, fmt: str) -> Dict:
+    if isinstance(raw, Exception):
+        raise raw
+    if fmt == "ndjson":
+        data = json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("Each line must be a JSON object")
+        return data
+    return raw
+
+
+async def _insert_batch(rows: List[Dict]) -> None:
+    # one bounded transaction per batch so the SQLite write lock is released between chunks
+    async with AsyncSessionLocal() as session:
+        names = {row["category"] for row in rows}
+        ids = await session.run_sync(lambda sync_session: category_ids(sync_session, names))
+        for row in rows:
+            row["category_id"] = ids[row["category"]]
+        await session.execute(insert(Product), rows)
+        await session.commit()
+
+
+async def import_products(stream: AsyncIterator[bytes], fmt: str, created_by: int) -> dict:
+    inserted = 0
+    failed = 0
+    errors: List[dict] = []
+    batch: List[Dict] = []
+    batch_rows: List[int] = []
+
+    def report(row_number: int, messages: List[str]):
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+            errors.append({"row": row_number, "errors": messages})
+
+    async def flush():
+        nonlocal inserted
+        if not batch:
+            return
+        try:
+            await _insert_batch(batch)
+            inserted += len(batch)
+        except Exception as e:
+            logger.error(f"Bulk import batch (rows {batch_rows[0]}-{batch_rows[-1]}) failed: {e}", exc_info=True)
+            for row_number in batch_rows:
+                report(row_number, ["Database insert failed"])
+        batch.clear()
+        batch_rows.clear()
+
+    try:
+        async for row_number, raw in _records(stream, fmt):
+            try:
+                product = ProductCreate(**_parse(raw, fmt))
+            except ValidationError as e:
+                report(row_number, [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()])
+                continue
+            except (ValueError, TypeError) as e:
+                report(row_number, [str(e)])
+                continue
+
+            error = check_product_fields(product)
+            if error:
+                report(row_number, [error])
+                continue
+
+            batch.append({
+                "name": product.name,
+                "description": product.description,
+                "price": product.price,
+                "stock": product.stock,
+                "category": product.category,
+                "image_url": str(product.image_url),
+                "created_by": created_by,
+            })
+            batch_rows.append(row_number)
+            if len(batch) >= settings.PRODUCT_IMPORT_BATCH_SIZE:
+                await flush()
+        await flush()
+    finally:
+        if inserted:
+            catalog_cache.invalidate()  # facet index notices the catalog_state bump and rebuilds itself
+
+    logger.info(f"Bulk product import finished: {inserted} inserted, {failed} failed")
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float,ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Float,ForeignKey
 from app.core.database import Base
 from sqlalchemy.orm import relationship
 
@@ -14,9 +16,52 @@ class Product(Base):
     category = Column(String(50),nullable = False)
     image_url = Column(String(255),nullable = False)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False) # users id -> as foreign key in product to restrict acess to creator only
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True) # normalized taxonomy entry for `category`
+    version = Column(Integer, nullable=False, server_default="1") # bumped on every ORM update, feeds the ETag
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_products_price_id', 'price', 'id'),  # keyset pagination for price sorts
+        Index('ix_products_name_id', 'name', 'id'),  # keyset pagination for name sort
+        Index('ix_products_category_id_id', 'category_id', 'id'),  # category listings as an index range scan
+    )
+    __mapper_args__ = {"version_id_col": version}
 
     cart_entries = relationship("Cart", back_populates="product", cascade="all, delete-orphan") #one to many-> 1 product = many cart entries
     order_items = relationship("OrderItem", back_populates="product")# 1 product -> in many order items(orders will be diff.)
     creator = relationship("User", back_populates="products")# many to one -> many products created by one particular user.
-    
-    
\ No newline at end of file
+    taxonomy = relationship("Category", back_populates="products")
+
+
+class Category(Base):
+    __tablename__ = 'categories'
+
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String(60), nullable=False, unique=True, index=True)
+    name = Column(String(50), nullable=False)
+    parent_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
+
+    parent = relationship("Category", remote_side=[id])
+    products = relationship("Product", back_populates="taxonomy")
+
+
+class CategoryClosure(Base):
+    # one row per (ancestor, descendant) pair including (c, c) at depth 0,
+    # so "category and everything below it" is a primary-key range read
+    __tablename__ = 'category_closure'
+
+    ancestor_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (Index('ix_category_closure_descendant_id', 'descendant_id'),)
+
+
+class CatalogState(Base):
+    # single row (id=1) bumped by triggers on every products insert/update/delete,
+    # so list ETags cost one primary-key read instead of an aggregate over the catalog
+    __tablename__ = 'catalog_state'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime, nullable=True)
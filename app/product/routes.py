@@ -2,10 +2,17 @@ from typing import List, Optional
 from app.auth.models import User
 from app.core.security import admin_required, get_current_user
 from app.product import schemas, services
-from fastapi import APIRouter, Depends, HTTPException,status,Query
+from app.product.importer import IMPORT_FORMATS, import_products
+from fastapi import APIRouter, Depends, HTTPException,status,Query,Request,Response
 from sqlalchemy.orm import Session
+from app.core.conditional import is_not_modified, make_etag, not_modified, validator_headers
 from app.core.database import get_session
-from fastapi.responses import JSONResponse
+from app.core.pagination import NEXT_CURSOR_HEADER, set_next_cursor
+from app.product.cache import catalog_cache, catalog_flights
+from app.core.settings import get_settings
+from pydantic import TypeAdapter
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.core.export import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, encode_records
 
 
 product_router = APIRouter(prefix="/products",     #for product crud
@@ -16,6 +23,9 @@ public_product_router = APIRouter(prefix="/public",  #for public product apis
     tags=["public"],
     responses={404: {"description": "Not found"}},)
 
+product_list_adapter = TypeAdapter(List[schemas.Product])
+settings = get_settings()
+
 
 @product_router.post("/create-products",status_code=status.HTTP_200_OK, response_model=schemas.Product)
 def create_product(
@@ -30,28 +40,111 @@ def create_product(
 
 
 
+@product_router.post("/categories", status_code=status.HTTP_201_CREATED, response_model=schemas.Category)
+def create_category(
+    category: schemas.CategoryCreate,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(admin_required),
+):
+    """
+    Add a taxonomy category, optionally under a parent (Admin only).
+    """
+    return services.create_category_service(db, category)
+
+
+@product_router.post("/import", status_code=status.HTTP_200_OK)
+async def bulk_import_products(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson (defaults from Content-Type)"),
+    current_user: User = Depends(admin_required),
+):
+    """
+    Bulk-create products from a streamed CSV (with header row) or NDJSON body (Admin only).
+    Returns counts and a per-row error report.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv")
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be csv or ndjson")
+    return await import_products(request.stream(), fmt, current_user.id)
+
+
 @product_router.get("/", response_model=list[schemas.Product])
 def get_products(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_session),
     current_user: User = Depends(admin_required),
 ):
     """
     Get list of products with pagination (Admin only).
     """
-    return  services.get_products(db=db, skip=skip, limit=limit)
+    catalog_version, last_modified = services.get_catalog_state(db)
+    etag = make_etag("admin-products", catalog_version, skip, limit, cursor)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    products = services.get_products(db=db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, products, limit, None, services.product_sort_key(None))
+    response.headers.update(validator_headers(etag, last_modified))
+    return products
+
+
+@product_router.get("/cache/stats")
+def catalog_cache_stats(current_user: User = Depends(admin_required)):
+    """
+    Hit ratio and memory footprint of the public catalog listing cache (Admin only).
+    """
+    return catalog_cache.stats()
+
+
+@product_router.get("/single-flight/stats")
+def catalog_single_flight_stats(current_user: User = Depends(admin_required)):
+    """
+    Executions vs coalesced waiters (with per-key wait times) for catalog queries (Admin only).
+    """
+    return catalog_flights.stats()
+
+
+@product_router.get("/export")
+def export_products(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    category: Optional[str] = None,
+    current_user: User = Depends(admin_required),
+):
+    """
+    Stream the whole catalog (optionally filtered by category) as NDJSON or CSV (Admin only).
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+    records = services.iter_products_for_export(category)
+    return StreamingResponse(
+        encode_records(records, format, services.PRODUCT_EXPORT_FIELDS),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
 
 
 @product_router.get("/{id}", response_model=schemas.Product)
 def get_product_by_id(
     id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_session),
     current_user: User = Depends(admin_required),
 ):
     """
     Get a specific product by ID (Admin only).
     """
+    version = services.get_product_version(db, id)
+    if version:
+        etag = make_etag("product", id, version.version)
+        if is_not_modified(request, etag, version.updated_at):
+            return not_modified(etag, version.updated_at)
+        response.headers.update(validator_headers(etag, version.updated_at))
     return services.get_product_by_id(db=db, product_id=id)
 
 
@@ -84,29 +177,125 @@ def delete_product(
    
 @public_product_router.get("/products", response_model=List[schemas.Product])
 def list_products(
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
+    category_id: Optional[int] = Query(None, description="Taxonomy category id (includes its subcategories)"),
+    category_slug: Optional[str] = Query(None, description="Taxonomy category slug (includes its subcategories)"),
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    sort_by: Optional[str] = Query(None, description="Options: price_asc, price_desc"),
-    page: int = 1,
-    page_size: int = 10,
+    sort_by: Optional[str] = Query(None, description="Options: price_asc, price_desc, name"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page (overrides page)"),
     session: Session = Depends(get_session)
 ):
     """
     list products based on category,min_price,max_price,sorting,pagination
     """
-    return  services.list_products_service(session, category, min_price, max_price, sort_by, page, page_size)
+    if sort_by not in services.PRODUCT_SORTS:
+        sort_by = None
+    # normalized once: the cache key, the ETag and the query all see the same filter values
+    category = category.strip().lower() or None if category else None
+    category_slug = category_slug.strip().lower() or None if category_slug else None
+    cache_key = (category, min_price, max_price, sort_by, page, page_size, cursor, category_id, category_slug)
+    cached = catalog_cache.get(cache_key)
+
+    # one primary-key read decides 304 and cache freshness before any listing query or serialization;
+    # catalog_state (not just this process's write hook) so writes made by other workers are seen too
+    version = catalog_cache.version  # read before querying so a concurrent write makes this entry stale
+    catalog_version, last_modified = services.get_catalog_state(session)
+    etag = make_etag("products", catalog_version, *cache_key)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    if cached and cached[1].get("ETag") == etag:
+        body, headers = cached
+        return Response(content=body, media_type="application/json", headers=headers)
+    if cached:
+        catalog_cache.discard(cache_key)  # built before the catalog moved on
+
+    products = services.list_products_service(session, category, min_price, max_price, sort_by,
+                                              (page - 1) * page_size, page_size, cursor, category_id, category_slug,
+                                              catalog_version)
+    set_next_cursor(response, products, page_size, sort_by, services.product_sort_key(sort_by))
+    body = product_list_adapter.dump_json(products)  # already validated response models
+    headers = validator_headers(etag, last_modified)
+    if NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    catalog_cache.set(cache_key, version, body, headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@public_product_router.get("/products/batch", response_model=schemas.ProductBatch)
+def batch_products(
+    ids: str = Query(..., description="Comma-separated product ids, e.g. 3,17,42"),
+    session: Session = Depends(get_session)
+):
+    """
+    resolve many product ids in one call; results keep the request order and list the ids that don't exist
+    """
+    try:
+        product_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="Provide at least one product id")
+    if len(product_ids) > settings.PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.PRODUCT_BATCH_MAX_IDS} ids per request")
+    return services.get_products_by_ids(session, product_ids)
+
+
+@public_product_router.get("/categories", response_model=List[schemas.Category])
+def list_categories(session: Session = Depends(get_session)):
+    """
+    category taxonomy (flat, with parent ids)
+    """
+    return services.list_categories_service(session)
+
+
+@public_product_router.get("/products/facets", response_model=schemas.ProductFacets)
+def product_facets(
+    category: Optional[str] = None,
+    category_id: Optional[int] = Query(None, description="Taxonomy category id (includes its subcategories)"),
+    category_slug: Optional[str] = Query(None, description="Taxonomy category slug (includes its subcategories)"),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bucket_width: float = Query(settings.FACET_PRICE_BUCKET_WIDTH, gt=0),
+    buckets: int = Query(settings.FACET_PRICE_BUCKETS, ge=1, le=50),
+    session: Session = Depends(get_session)
+):
+    """
+    category counts and price histogram for the same filters as /public/products
+    """
+    category = category.strip().lower() or None if category else None
+    category_slug = category_slug.strip().lower() or None if category_slug else None
+    return services.product_facets_service(session, category, min_price, max_price, bucket_width, buckets,
+                                           category_id, category_slug)
+
+
+@public_product_router.get("/products/suggest", response_model=List[schemas.Suggestion])
+def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+    session: Session = Depends(get_session)
+):
+    """
+    typeahead suggestions for product names and categories (word prefixes first, then typo-tolerant matches)
+    """
+    return services.suggest_products_service(session, q, limit)
 
 
 @public_product_router.get("/products/search", response_model=List[schemas.Product])
 def search_products(
     keyword: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
     session: Session = Depends(get_session)
 ):
     """
-    list products based on keyword
+    list products based on keyword (full-text, prefix matching, ranked by relevance)
     """
-    return  services.search_products_service(session, keyword)
+    return  services.search_products_service(session, keyword, (page - 1) * page_size, page_size)
  
 
 
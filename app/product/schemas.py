@@ -1,5 +1,5 @@
 from pydantic import BaseModel,HttpUrl,Field
-from typing import Optional
+from typing import List, Optional
 class ProductCreate(BaseModel):  # request body to create product
     name: str 
     description: str 
@@ -11,6 +11,7 @@ class ProductCreate(BaseModel):  # request body to create product
 
 class Product(ProductCreate):  # response body after product creation
     id: int
+    category_id: Optional[int] = None
     # created_by: int  
     class Config:
         from_attributes = True
@@ -22,4 +23,52 @@ class ProductSummary(BaseModel): # used to show only basic info of products to c
     image_url: HttpUrl
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CategoryCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=50)
+    parent_id: Optional[int] = None
+
+
+class Category(BaseModel):
+    id: int
+    slug: str
+    name: str
+    parent_id: Optional[int]
+
+    class Config:
+        from_attributes = True
+
+
+class ProductBatchItem(BaseModel):  # product is null when the id does not exist
+    id: int
+    product: Optional[ProductSummary]
+
+
+class ProductBatch(BaseModel):  # items in request order
+    items: List[ProductBatchItem]
+    missing: List[int]
+
+
+class CategoryFacet(BaseModel):
+    category: str
+    count: int
+
+
+class PriceBucket(BaseModel):  # [min, max) except the last bucket, which includes max (or is open-ended when max is null)
+    min: float
+    max: Optional[float]
+    count: int
+
+
+class ProductFacets(BaseModel):
+    total: int
+    categories: List[CategoryFacet]
+    price_histogram: List[PriceBucket]
+
+
+class Suggestion(BaseModel):
+    text: str
+    type: str   # "product" or "category"
+    match: str  # "prefix" or "fuzzy"
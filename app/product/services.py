@@ -1,41 +1,65 @@
-from typing import List, Optional
+import re
+from typing import Iterator, List, Optional
 
 from app.auth.models import User
+from app.core.database import SessionLocal
 from app.core.logger import get_logger
+from app.core.settings import get_settings
+from app.core.pagination import decode_cursor
 from fastapi import HTTPException, status
 
-from app.product.models import Product
-from app.product.schemas import ProductCreate
+from app.product.cache import catalog_cache, catalog_flights
+from app.product.categories import category_ids, create_category, descendant_ids, resolve_category
+from app.product.columnar import catalog_columns
+from app.product.facets import catalog_facets
+from app.product.models import CatalogState, Category, Product
+from app.product.suggest import catalog_suggestions
+from app.product.schemas import CategoryCreate, ProductCreate, Product as ProductOut
+from sqlalchemy import select, text, tuple_
 from sqlalchemy.orm import Session
 
 logger = get_logger("product")
+settings = get_settings()
+
+
+def check_product_fields(product: ProductCreate) -> Optional[str]:
+    # business rules on top of the ProductCreate schema; returns the error message, if any
+    if not product.name:
+        return "Enter a valid product name"
+    if not product.price:
+        return "Enter price"
+    if not product.stock:
+        return "Stock of item is mandatory"
+    if not product.category:
+        return "Enter a valid product category"
+    if not product.image_url:
+        return "Enter an image url"
+    return None
 
 
 def create_product(db: Session, product: ProductCreate,current_user: User):
     try:
-        if not product.name:
-            raise HTTPException(status_code=400,detail="Enter a valid product name")
-        if not product.price:
-            raise HTTPException(status_code=400,detail="Enter price")
-        if not product.stock:
-            raise HTTPException(status_code=400,detail="Stock of item is mandatory")
-        if not product.category:
-            raise HTTPException(status_code=400,detail="Enter a valid product category")
-        if not product.image_url:
-            raise HTTPException(status_code=400,detail="Enter an image url")
-        
+        error = check_product_fields(product)
+        if error:
+            raise HTTPException(status_code=400,detail=error)
+
         db_product = Product(
             name = product.name,
             description=product.description,
             price=product.price,
             stock=product.stock,
             category=product.category,
+            category_id=category_ids(db, [product.category])[product.category],
             image_url=str(product.image_url),
             created_by=current_user.id
         )
         db.add(db_product)
         db.commit()
         db.refresh(db_product)
+        catalog_cache.invalidate()
+        catalog_facets.apply(db, added=(db_product.category, db_product.category_id, db_product.price))
+        catalog_suggestions.apply(db, added=(db_product.name, db_product.category))
+        catalog_columns.apply(db, db_product.id, db_product)
         logger.info(f"Product created: {db_product.name}")
         return db_product
     
@@ -49,11 +73,18 @@ def create_product(db: Session, product: ProductCreate,current_user: User):
         
 
 
-def get_products(db: Session, skip: int = 0, limit: int = 10):
+def get_products(db: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
     try:
-        logger.debug(f"Fetching products skip={skip},limit={limit}")
-        return db.query(Product).offset(skip).limit(limit).all()
-    
+        logger.debug(f"Fetching products skip={skip},limit={limit},cursor={cursor}")
+        query = db.query(Product).order_by(Product.id.asc())
+        if cursor:
+            _, last_id = decode_cursor(cursor, None)
+            return query.filter(Product.id > last_id).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
+
+    except HTTPException as http_exc:
+        raise http_exc
+
     except Exception as e:
         logger.error(f"Error fetching products:{e}",exc_info=True)
         raise HTTPException(status_code=500,detail="Failed to fetch products")
@@ -85,16 +116,23 @@ def update_product(db: Session, product_id: int, updated_data: ProductCreate,cur
             logger.warning(f"Unauthorized product update attempt by user {current_user.email}")
             raise HTTPException(status_code=403, detail="You are not allowed to update this product.")
 
+        previous = (product.category, product.category_id, product.price)
+        previous_terms = (product.name, product.category)
         product.name = updated_data.name
         product.description = updated_data.description
         product.price = updated_data.price
         product.stock = updated_data.stock
         product.category = updated_data.category
+        product.category_id = category_ids(db, [updated_data.category])[updated_data.category]
         product.image_url = str(updated_data.image_url) 
 
         db.commit()
         db.refresh(product)
-        
+        catalog_cache.invalidate()
+        catalog_facets.apply(db, removed=previous, added=(product.category, product.category_id, product.price))
+        catalog_suggestions.apply(db, removed=previous_terms, added=(product.name, product.category))
+        catalog_columns.apply(db, product.id, product)
+
         logger.info(f"Product updated: ID {product_id}")
         return product
     
@@ -121,6 +159,10 @@ def delete_product(db: Session, product_id: int, current_user:User):
 
         db.delete(product)
         db.commit()
+        catalog_cache.invalidate()
+        catalog_facets.apply(db, removed=(product.category, product.category_id, product.price))
+        catalog_suggestions.apply(db, removed=(product.name, product.category))
+        catalog_columns.apply(db, product_id)
         logger.info(f"Product deleted: ID {product_id}")
         
     except HTTPException as http_exc:
@@ -132,8 +174,69 @@ def delete_product(db: Session, product_id: int, current_user:User):
         raise HTTPException(status_code=500, detail="Failed to delete product")
     
     
+def create_category_service(db: Session, data: CategoryCreate):
+    try:
+        return create_category(db, data.name, data.parent_id)
+    except HTTPException as http_exc:
+        logger.warning(f"Validation error during category creation: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"Error creating category: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to create category")
+
+
+def list_categories_service(session: Session) -> List[Category]:
+    try:
+        return session.query(Category).order_by(Category.name, Category.id).all()
+    except Exception as e:
+        logger.error(f"Error listing categories: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to list categories")
+
+
+def get_product_version(db: Session, product_id: int):
+    # (version, updated_at) only: enough to answer a conditional GET without loading the row
+    return db.query(Product.version, Product.updated_at).filter(Product.id == product_id).first()
+
+
+def get_catalog_state(db: Session):
+    state = db.query(CatalogState.version, CatalogState.updated_at).filter(CatalogState.id == 1).first()
+    return (state.version, state.updated_at) if state else (0, None)
+
+
+PRODUCT_EXPORT_FIELDS = ["id", "name", "description", "price", "stock", "category", "image_url", "created_by", "updated_at"]
+
+
+def iter_products_for_export(category: Optional[str] = None) -> Iterator[dict]:
+    # keyset chunks, each in its own short session: the request-scoped one is closed before a
+    # StreamingResponse body is sent, and one long read transaction would pin the database for the whole stream
+    query = select(*[getattr(Product, field) for field in PRODUCT_EXPORT_FIELDS]).order_by(Product.id)
+    if category:
+        query = query.where(Product.category.ilike(f"%{category}%"))
+    last_id = 0
+    while True:
+        with SessionLocal() as session:
+            rows = session.execute(query.where(Product.id > last_id).limit(settings.EXPORT_BATCH_SIZE)).all()
+        for row in rows:
+            yield row._asdict()
+        if len(rows) < settings.EXPORT_BATCH_SIZE:
+            return
+        last_id = rows[-1].id
+
+
 #PUBLIC PRODUCT APIS
 
+PRODUCT_SORTS = ("price_asc", "price_desc", "name")
+
+
+def product_sort_key(sort_by: Optional[str]):
+    # value the listing is ordered by (besides id), as stored in a cursor
+    if sort_by in ("price_asc", "price_desc"):
+        return lambda product: product.price
+    if sort_by == "name":
+        return lambda product: product.name
+    return lambda product: None
+
+
 def list_products_service(
     session: Session,
     category: Optional[str],
@@ -141,12 +244,52 @@ def list_products_service(
     max_price: Optional[float],
     sort_by: Optional[str],
     skip: int=0,
-    limit: int=10
+    limit: int=10,
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    category_slug: Optional[str] = None,
+    catalog_version: Optional[int] = None
+) -> List[ProductOut]:
+    # the catalog version (read before querying) is part of the key: a request that starts after a write
+    # never joins a query that started before it
+    if catalog_version is None:
+        catalog_version = get_catalog_state(session)[0]
+    key = ("list", catalog_version, category, min_price, max_price, sort_by, skip, limit, cursor, category_id, category_slug)
+    return list(catalog_flights.do(key, lambda: _shared_result(_list_products(
+        session, category, min_price, max_price, sort_by, skip, limit, cursor, category_id, category_slug
+    ))))
+
+
+def _shared_result(products: List[Product]) -> tuple:
+    # single-flight followers run in other threads after the leader's request Session is closed:
+    # hand them validated response models, never the leader's identity-mapped ORM objects
+    return tuple(ProductOut.model_validate(product) for product in products)
+
+
+def _list_products(
+    session: Session,
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    sort_by: Optional[str],
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    category_id: Optional[int] = None,
+    category_slug: Optional[str] = None
 ) -> List[Product]:
     try:
         logger.debug("Listing products with filters")
+        if sort_by not in PRODUCT_SORTS:
+            sort_by = None
+        taxonomy_id = resolve_category(session, category_id, category_slug)
+        if catalog_columns.enabled and taxonomy_id is None:
+            return _list_products_columnar(session, category, min_price, max_price, sort_by, skip, limit, cursor)
         query = session.query(Product)
 
+        if taxonomy_id is not None:  # exact taxonomy match incl. descendants, served by ix_products_category_id_id
+            query = query.filter(Product.category_id.in_(descendant_ids(taxonomy_id)))
+
         if category:
             query = query.filter(Product.category.ilike(f"%{category}%")) #ilike means matches case insensative values
 
@@ -156,29 +299,131 @@ def list_products_service(
         if max_price is not None:
             query = query.filter(Product.price <= max_price)
 
+        # id breaks ties so the order is total and a cursor can resume from any row
         if sort_by == "price_asc":
-            query = query.order_by(Product.price.asc())
+            query = query.order_by(Product.price.asc(), Product.id.asc())
         elif sort_by == "price_desc":
-            query = query.order_by(Product.price.desc())
+            query = query.order_by(Product.price.desc(), Product.id.desc())
         elif sort_by == "name":
-            query = query.order_by(Product.name.asc())
+            query = query.order_by(Product.name.asc(), Product.id.asc())
+        else:
+            query = query.order_by(Product.id.asc())
+
+        if cursor:  # keyset: seek past the last row instead of counting OFFSET rows
+            key, last_id = decode_cursor(cursor, sort_by)
+            if sort_by == "price_asc":
+                query = query.filter(tuple_(Product.price, Product.id) > tuple_(key, last_id))
+            elif sort_by == "price_desc":
+                query = query.filter(tuple_(Product.price, Product.id) < tuple_(key, last_id))
+            elif sort_by == "name":
+                query = query.filter(tuple_(Product.name, Product.id) > tuple_(key, last_id))
+            else:
+                query = query.filter(Product.id > last_id)
+            skip = 0
 
         products = query.offset(skip).limit(limit).all()
         return products
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         logger.error(f"Error listing products: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to list products")
 
-def search_products_service(
+
+def _list_products_columnar(
     session: Session,
-    keyword: str
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    sort_by: Optional[str],
+    skip: int,
+    limit: int,
+    cursor: Optional[str]
 ) -> List[Product]:
+    # filter/sort/paginate on the columnar snapshot, then hydrate just the page in one IN query
+    after = decode_cursor(cursor, sort_by) if cursor else None
+    ids = catalog_columns.list_product_ids(session, category, min_price, max_price, sort_by, skip, limit, after)
+    if not ids:
+        return []
+    products = {product.id: product for product in session.query(Product).filter(Product.id.in_(ids))}
+    return [products[product_id] for product_id in ids if product_id in products]
+
+
+def get_products_by_ids(session: Session, ids: List[int]) -> dict:
     try:
-        logger.debug(f"Searching products by keyword: {keyword}")
-        return session.query(Product).filter(
-            (Product.name.ilike(f"%{keyword}%")) |
-            (Product.description.ilike(f"%{keyword}%"))
+        logger.debug(f"Batch lookup of {len(ids)} products")
+        # one IN query over the distinct ids, only the columns ProductSummary needs
+        rows = session.query(Product.id, Product.name, Product.price, Product.image_url).filter(
+            Product.id.in_(set(ids))
         ).all()
+        found = {row.id: row for row in rows}
+        return {
+            "items": [{"id": product_id, "product": found.get(product_id)} for product_id in ids],
+            "missing": [product_id for product_id in dict.fromkeys(ids) if product_id not in found],
+        }
+    except Exception as e:
+        logger.error(f"Error in batch product lookup: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to fetch products")
+
+
+def product_facets_service(
+    session: Session,
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    bucket_width: float,
+    buckets: int,
+    category_id: Optional[int] = None,
+    category_slug: Optional[str] = None
+) -> dict:
+    try:
+        logger.debug("Summarizing product facets")
+        return catalog_facets.summary(session, category, min_price, max_price, bucket_width, buckets,
+                                      category_id, category_slug)
+    except Exception as e:
+        logger.error(f"Error summarizing product facets: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load product facets")
+
+
+def suggest_products_service(session: Session, query: str, limit: int) -> List[dict]:
+    try:
+        logger.debug(f"Suggesting products for: {query}")
+        return catalog_suggestions.suggest(session, query, limit)
+    except Exception as e:
+        logger.error(f"Error suggesting products: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load suggestions")
+
+
+FTS_SEARCH_SQL = text("""
+    SELECT products.* FROM products_fts
+    JOIN products ON products.id = products_fts.rowid
+    WHERE products_fts MATCH :match
+    ORDER BY bm25(products_fts, 10.0, 1.0, 2.0)
+    LIMIT :limit OFFSET :skip
+""")  # bm25 column weights: name, description, category
+
+
+def _fts_prefix_query(keyword: str) -> str:
+    # every word must match, last characters typed so far count as a prefix: "red sho" -> "red"* "sho"*
+    terms = re.findall(r"\w+", keyword)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_products_service(
+    session: Session,
+    keyword: str,
+    skip: int = 0,
+    limit: int = 10
+) -> List[ProductOut]:
+    try:
+        logger.debug(f"Searching products by keyword: {keyword}")
+        match = _fts_prefix_query(keyword)
+        if not match:
+            return []
+        catalog_version = get_catalog_state(session)[0]  # same rule as listings: never join a pre-write query
+        return list(catalog_flights.do(("search", catalog_version, match, skip, limit), lambda: _shared_result(
+            session.query(Product).from_statement(FTS_SEARCH_SQL).params(match=match, limit=limit, skip=skip).all()
+        )))
     except Exception as e:
         logger.error(f"Error searching products: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to search products")
\ No newline at end of file
@@ -0,0 +1,254 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.logger import get_logger
+from app.core.settings import get_settings
+from app.product.facets import _catalog_version
+from app.product.models import Product
+
+try:
+    import numpy as np
+except ImportError:  # optional: fuzzy matches fall back to counting postings in Python
+    np = None
+
+logger = get_logger("product")
+settings = get_settings()
+
+NAME, CATEGORY = 0, 1
+TERM_TYPES = ("product", "category")
+END = b"\0"  # closes every term in the key buffer, sorts before any character
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def _trigrams(text: str, partial_last_word: bool = False) -> Set[str]:
+    # pg_trgm style: each word padded with two leading spaces and one trailing space;
+    # a word still being typed gets no trailing pad so "sho" doesn't look like a whole word
+    grams = set()
+    words = text.split()
+    for position, word in enumerate(words):
+        padded = f"  {word}" if partial_last_word and position == len(words) - 1 else f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CatalogSuggestions:
+    """
+    In-memory typeahead index over distinct product names and categories ("terms").
+
+    Prefix index: every normalized term is stored once, NUL-terminated, in one UTF-8 buffer
+    (term i starts at `_starts[i]`). Its keys are the term and every suffix starting at a word
+    boundary ("red running shoes", "running shoes", "shoes"), kept as one sorted array of
+    buffer offsets; any word prefix is a bisection over that array plus a short scan, and a
+    key's term is a bisection over `_starts`. Display texts live in a second joined buffer.
+    Trigram index: trigram -> array of term ids, used for typo-tolerant matches when the
+    prefix scan comes up short; postings of trigrams found in more than SUGGEST_MAX_POSTINGS
+    terms are dropped, they say little about a match and dominate the cost.
+    Products only move term reference counts; a term's keys are added/removed when its count
+    leaves/reaches zero, its text and trigram postings are never rewritten (dead terms are
+    skipped, a revived term gets a new id) until the next rebuild compacts them.
+    `version` tracks catalog_state.version exactly like CatalogFacets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.version = -1
+
+    def _reset(self) -> None:
+        self._text = bytearray()
+        self._starts = array("q")
+        self._keys = array("q")
+        self._display = bytearray()
+        self._display_ends = array("q")
+        self._term_types = bytearray()
+        self._term_refs = array("l")
+        self._grams: Dict[str, Optional[array]] = {}
+
+    def rebuild(self, session: Session) -> None:
+        with self._lock:
+            self._rebuild(session)
+
+    def _rebuild(self, session: Session) -> None:
+        version = _catalog_version(session)
+        self._reset()
+        term_ids: Dict[bytes, int] = {}  # kind byte + normalized text, only while loading: live lookups go through the key array
+        keys: List[int] = []
+        for name, category in session.query(Product.name, Product.category).yield_per(10000):
+            for kind, text in ((NAME, name), (CATEGORY, category)):
+                normalized = _normalize(text or "").encode()
+                if not normalized:
+                    continue
+                key = bytes((kind,)) + normalized
+                term_id = term_ids.get(key)
+                if term_id is None:
+                    term_id = term_ids[key] = self._add_term(kind, text, normalized)
+                    keys.extend(self._term_keys(term_id))
+                self._term_refs[term_id] += 1
+        text = self._text
+        keys.sort(key=lambda position: text[position:text.index(END, position)])
+        self._keys = array("q", keys)
+        self.version = version
+        logger.info(f"Suggestion index rebuilt: {len(term_ids)} terms, {len(self._keys)} prefix keys, "
+                    f"{len(self._grams)} trigrams (catalog version {version})")
+
+    def apply(self, session: Session, removed: Optional[Tuple[str, str]] = None,
+              added: Optional[Tuple[str, str]] = None) -> None:
+        """Apply one committed product write as (name, category) pairs; called by the product services after commit."""
+        with self._lock:
+            version = _catalog_version(session)
+            if self.version < 0 or version != self.version + 1:
+                self.version = -1  # someone else wrote in between: rebuild on next read
+                return
+            if removed:
+                for kind, text in ((NAME, removed[0]), (CATEGORY, removed[1])):
+                    self._unref(kind, text)
+            if added:
+                for kind, text in ((NAME, added[0]), (CATEGORY, added[1])):
+                    self._ref(kind, text)
+            self.version = version
+
+    def suggest(self, session: Session, query: str, limit: int) -> List[dict]:
+        with self._lock:
+            if self.version != _catalog_version(session):
+                self._rebuild(session)
+
+            needle = _normalize(query)
+            if not needle:
+                return []
+            suggestions: List[dict] = []
+            seen: Set[int] = set()
+
+            # prefix matches: bounded scan so a one-letter query over 1M names stays cheap
+            prefix = needle.encode()
+            width = len(prefix)
+            text, keys = self._text, self._keys
+            index = bisect_left(keys, prefix, key=lambda position: text[position:position + width])
+            end = min(len(keys), index + limit * 20)
+            while index < end and len(suggestions) < limit and text[keys[index]:keys[index] + width] == prefix:
+                term_id = self._term_at(keys[index])
+                if term_id not in seen:
+                    seen.add(term_id)
+                    suggestions.append(self._suggestion(term_id, "prefix"))
+                index += 1
+
+            if len(suggestions) < limit and len(needle) >= 3:
+                suggestions.extend(self._fuzzy(needle, limit - len(suggestions), seen))
+            return suggestions
+
+    def _fuzzy(self, needle: str, limit: int, seen: Set[int]) -> List[dict]:
+        grams = _trigrams(needle, partial_last_word=True)
+        postings = [self._grams[gram] for gram in grams if self._grams.get(gram)]
+        threshold = settings.SUGGEST_MIN_SIMILARITY * len(grams)
+        if not postings:
+            return []
+        if np is not None:
+            term_ids, counts = np.unique(np.concatenate([np.frombuffer(p, dtype=np.int32) for p in postings]),
+                                         return_counts=True)
+            matched = counts >= threshold
+            term_ids, counts = term_ids[matched], counts[matched]
+            ends = np.frombuffer(self._display_ends, dtype=np.int64)
+            lengths = ends[term_ids] - np.where(term_ids > 0, ends[term_ids - 1], 0)
+            ranked = term_ids[np.lexsort((term_ids, lengths, -counts))].tolist()
+        else:
+            shared: Counter = Counter()
+            for posting in postings:
+                shared.update(posting)
+            ranked = sorted((term_id for term_id, count in shared.items() if count >= threshold),
+                            key=lambda term_id: (-shared[term_id], len(self._display_text(term_id)), term_id))
+        suggestions = []
+        for term_id in ranked:
+            if len(suggestions) == limit:
+                break
+            if term_id not in seen and self._term_refs[term_id]:
+                suggestions.append(self._suggestion(term_id, "fuzzy"))
+        return suggestions
+
+    def _suggestion(self, term_id: int, match: str) -> dict:
+        return {"text": self._display_text(term_id).decode(), "type": TERM_TYPES[self._term_types[term_id]], "match": match}
+
+    def _display_text(self, term_id: int) -> bytes:
+        return self._display[self._display_ends[term_id - 1] if term_id else 0:self._display_ends[term_id]]
+
+    def _term_at(self, position: int) -> int:
+        return bisect_right(self._starts, position) - 1
+
+    def _add_term(self, kind: int, text: str, normalized: bytes) -> int:
+        term_id = len(self._starts)
+        self._starts.append(len(self._text))
+        self._text += normalized + END
+        self._display += text.encode()
+        self._display_ends.append(len(self._display))
+        self._term_types.append(kind)
+        self._term_refs.append(0)
+        for gram in _trigrams(normalized.decode()):
+            posting = self._grams.setdefault(gram, array("i"))
+            if posting is None:
+                continue
+            posting.append(term_id)
+            if len(posting) > settings.SUGGEST_MAX_POSTINGS:
+                self._grams[gram] = None  # too common to be worth counting
+        return term_id
+
+    def _find(self, kind: int, normalized: bytes) -> Optional[int]:
+        """Live term with exactly this normalized text: its first key is the whole term."""
+        probe = normalized + END
+        width = len(probe)
+        text, keys = self._text, self._keys
+        index = bisect_left(keys, probe, key=lambda position: text[position:position + width])
+        while index < len(keys) and text[keys[index]:keys[index] + width] == probe:
+            term_id = self._term_at(keys[index])
+            if self._starts[term_id] == keys[index] and self._term_types[term_id] == kind:
+                return term_id
+            index += 1
+        return None
+
+    def _ref(self, kind: int, text: str) -> None:
+        normalized = _normalize(text or "").encode()
+        if not normalized:
+            return
+        term_id = self._find(kind, normalized)
+        if term_id is None:
+            term_id = self._add_term(kind, text, normalized)
+            self._insert_keys(term_id)
+        self._term_refs[term_id] += 1
+
+    def _unref(self, kind: int, text: str) -> None:
+        normalized = _normalize(text or "").encode()
+        term_id = self._find(kind, normalized) if normalized else None
+        if term_id is None:
+            return
+        self._term_refs[term_id] -= 1
+        if not self._term_refs[term_id]:
+            for position in self._term_keys(term_id):
+                index = self._key_index(position)
+                while self._keys[index] != position:
+                    index += 1
+                del self._keys[index]
+
+    def _insert_keys(self, term_id: int) -> None:
+        for position in self._term_keys(term_id):
+            self._keys.insert(self._key_index(position), position)
+
+    def _key_index(self, position: int) -> int:
+        """First index in the key array whose key equals (or sorts after) the key at `position`."""
+        text = self._text
+        probe = bytes(text[position:text.index(END, position) + 1])
+        width = len(probe)
+        return bisect_left(self._keys, probe, key=lambda other: text[other:other + width])
+
+    def _term_keys(self, term_id: int) -> List[int]:
+        start = self._starts[term_id]
+        end = self._text.index(END, start)
+        return [start] + [start + i + 1 for i, byte in enumerate(self._text[start:end]) if byte == 32]
+
+
+catalog_suggestions = CatalogSuggestions()
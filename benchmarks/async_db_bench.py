@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.scratch import migrate, product_rows
+
+from sqlalchemy import insert, select
+
+from app.auth.models import User
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.product.models import Product
+
+USERS = 1000
+
+
+def _seed(products: int) -> None:
+    with SessionLocal() as session:
+        session.execute(insert(User), [{"name": "Bench", "email": f"user{i}@bench.com", "password": "x", "role": "user",
+                                        "is_active": True} for i in range(USERS)])
+        for rows in product_rows(products):
+            session.execute(insert(Product), rows)
+        session.commit()
+
+
+def _me_query(i: int):
+    return select(User).where(User.email == f"user{i % USERS}@bench.com")
+
+
+def _products_query(i: int):
+    return select(Product).order_by(Product.id).offset(i % 100 * 10).limit(10)
+
+
+async def _sync_request(i: int) -> None:
+    # the old path: a blocking Session query inside an async handler, run on the event loop
+    with SessionLocal() as session:
+        session.execute(_me_query(i)).scalars().first()
+        session.execute(_products_query(i)).scalars().all()
+
+
+async def _async_request(i: int) -> None:
+    async with AsyncSessionLocal() as session:
+        (await session.execute(_me_query(i))).scalars().first()
+        (await session.execute(_products_query(i))).scalars().all()
+
+
+async def _loop_lag(stop: asyncio.Event, lags: list) -> None:
+    # how late a 1 ms timer fires: what every other request on the worker waits for
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def _run(request, concurrency: int, seconds: float):
+    done = 0
+    lags: list = []
+    stop = asyncio.Event()
+    deadline = time.perf_counter() + seconds
+
+    async def client(offset: int):
+        nonlocal done
+        i = offset
+        while time.perf_counter() < deadline:
+            await request(i)
+            done += 1
+            i += concurrency
+            await asyncio.sleep(0)  # the next request arrives over the network
+
+    probe = asyncio.create_task(_loop_lag(stop, lags))
+    await asyncio.gather(*(client(c) for c in range(concurrency)))
+    stop.set()
+    await probe
+    return done / seconds, statistics.quantiles(lags, n=100)[98] if len(lags) > 1 else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /users/me + /public/products queries: sync Session on the loop vs AsyncSession.")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    migrate()
+    _seed(args.products)
+    print(f"{'path':>7}{'clients':>9}{'requests/sec':>14}{'p99 loop lag ms':>17}")
+    for label, request in (("sync", _sync_request), ("async", _async_request)):
+        for concurrency in args.concurrency:
+            throughput, lag = asyncio.run(_run(request, concurrency, args.seconds))
+            print(f"{label:>7}{concurrency:>9}{throughput:>14.0f}{lag:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
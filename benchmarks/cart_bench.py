@@ -0,0 +1,75 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.auth.models import *  # noqa: F401,F403  (register every table the cart FKs point at)
+from app.orders.models import Order, OrderItem  # noqa: F401
+from app.cart import services
+from app.cart.store import cart_store
+from app.core.settings import get_settings
+from app.cart.schemas import CartCreate, CartUpdate
+from app.product.models import Product
+
+settings = get_settings()
+
+PRODUCTS = 50
+
+
+def _worker(session_factory, user_id: int, deadline: float, counts: list, index: int) -> None:
+    ops = 0
+    with session_factory() as session:
+        while time.perf_counter() < deadline:
+            product_id = ops % PRODUCTS + 1
+            services.add_to_cart(session, user_id, CartCreate(product_id=product_id, quantity=1))
+            services.update_cart_quantity(session, user_id, product_id, CartUpdate(quantity=3))
+            services.remove_cart_item(session, user_id, product_id)
+            ops += 3
+    counts[index] = ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cart add/update/remove throughput with concurrent users, SQL vs write-behind store.")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--store", nargs="+", choices=["sql", "memory"], default=["sql", "memory"])
+    args = parser.parse_args()
+
+    print(f"{'store':>7}{'users':>6}{'ops/sec':>12}{'final flush ms':>16}")
+    for store, users in ((store, users) for store in args.store for users in args.users):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            Base.metadata.create_all(engine)
+            session_factory = sessionmaker(bind=engine)
+            settings.CART_STORE = store
+            cart_store.session_factory = session_factory
+            with session_factory() as session:
+                session.execute(insert(Product), [{
+                    "name": f"Product {i}", "description": "", "price": 10.0 + i, "stock": 100,
+                    "category": "Bench", "image_url": "https://example.com/p.jpg", "created_by": 1,
+                } for i in range(PRODUCTS)])
+                session.commit()
+
+            counts = [0] * users
+            deadline = time.perf_counter() + args.seconds
+            threads = [threading.Thread(target=_worker, args=(session_factory, user + 1, deadline, counts, user))
+                       for user in range(users)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            start = time.perf_counter()
+            if cart_store.enabled:
+                cart_store.flush()
+                cart_store.forget(list(range(1, users + 1)))  # next run starts from its own empty database
+            print(f"{store:>7}{users:>6}{sum(counts) / args.seconds:>12.0f}{(time.perf_counter() - start) * 1000:>16.1f}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
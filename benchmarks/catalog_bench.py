@@ -0,0 +1,98 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.settings import get_settings
+from app.auth.models import *  # noqa: F401,F403  (register every table the product FKs point at)
+from app.cart.models import Cart  # noqa: F401
+from app.orders.models import Order, OrderItem  # noqa: F401
+from app.product import services
+from app.product.columnar import catalog_columns, np
+from app.product.models import Product
+
+settings = get_settings()
+
+CATEGORIES = [f"Category {i}" for i in range(40)]
+QUERIES = {
+    "no filter, id order": dict(category=None, min_price=None, max_price=None, sort_by=None),
+    "category, price_asc": dict(category="category 1", min_price=None, max_price=None, sort_by="price_asc"),
+    "price range, price_desc": dict(category=None, min_price=100.0, max_price=400.0, sort_by="price_desc"),
+    "category + range, name": dict(category="category 2", min_price=50.0, max_price=900.0, sort_by="name"),
+}
+
+
+def _seed(session_factory, products: int) -> None:
+    rng = random.Random(42)
+    with session_factory() as session:
+        for start in range(0, products, 10000):
+            rows = [{
+                "name": f"Product {rng.randrange(products * 10):08d}",
+                "description": "",
+                "price": round(rng.uniform(1, 1000), 2),
+                "stock": rng.randrange(1, 500),
+                "category": rng.choice(CATEGORIES),
+                "image_url": "https://example.com/p.jpg",
+                "created_by": 1,
+            } for _ in range(start, min(products, start + 10000))]
+            session.execute(insert(Product), rows)
+        session.commit()
+
+
+def _time_ms(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def _bench_batch(session, products: int, size: int, repeats: int) -> None:
+    ids = random.Random(7).sample(range(1, products + 1), size)
+    one_by_one = _time_ms(lambda: [services.get_product_by_id(session, product_id) for product_id in ids], repeats)
+    batched = _time_ms(lambda: services.get_products_by_ids(session, ids), repeats)
+    print(f"{f'lookup {size} ids':<28}{one_by_one:>10.1f}{batched:>14.1f}   (one-by-one vs batch)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQL and columnar public listing latency (and per-id vs batch lookups) on synthetic catalogs.")
+    parser.add_argument("--products", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--page", type=int, default=5, help="page number (page size 10) to fetch with skip/limit")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=100, help="ids per batch lookup comparison")
+    args = parser.parse_args()
+    if np is None:
+        parser.error("numpy is required for the columnar engine (pip install numpy)")
+
+    for products in args.products:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            Base.metadata.create_all(engine)
+            session_factory = sessionmaker(bind=engine)
+            _seed(session_factory, products)
+
+            with session_factory() as session:
+                settings.CATALOG_ENGINE = "columnar"
+                start = time.perf_counter()
+                catalog_columns.rebuild(session)
+                print(f"\n{products} products (columnar snapshot built in {(time.perf_counter() - start) * 1000:.0f} ms)")
+                print(f"{'query':<28}{'sql ms':>10}{'columnar ms':>14}")
+                skip = (args.page - 1) * 10
+                for label, filters in QUERIES.items():
+                    timings = []
+                    for engine_name in ("sql", "columnar"):
+                        settings.CATALOG_ENGINE = engine_name
+                        timings.append(_time_ms(lambda: services._list_products(session, **filters, skip=skip, limit=10, cursor=None), args.repeats))
+                    print(f"{label:<28}{timings[0]:>10.1f}{timings[1]:>14.1f}")
+                _bench_batch(session, products, args.batch_size, args.repeats)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from benchmarks import scratch  # noqa: F401  (settings for a throwaway environment)
+
+from fastapi import HTTPException
+
+from app.core import security
+
+PASSWORD = "Bench#Password1"
+
+
+async def _probe(stop: asyncio.Event, latencies: list) -> None:
+    # an unrelated cheap endpoint: how long a 1 ms timer takes to fire while logins run
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def _storm(verify, hashed: str, concurrency: int, seconds: float):
+    logins = rejected = 0
+    latencies: list = []
+    stop = asyncio.Event()
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal logins, rejected
+        while time.perf_counter() < deadline:
+            try:
+                await verify(PASSWORD, hashed)
+                logins += 1
+            except HTTPException:
+                rejected += 1
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0)
+
+    probe = asyncio.create_task(_probe(stop, latencies))
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    stop.set()
+    await probe
+    p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else float("nan")
+    return logins / seconds, rejected, p99
+
+
+async def _inline(plain, hashed):
+    # the old path: bcrypt on the event loop
+    return security.verify_and_update_password(plain, hashed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Login storm: bcrypt verify on the event loop vs the hash pool "
+                    "(PASSWORD_HASH_EXECUTOR / PASSWORD_HASH_WORKERS pick the pool)."
+    )
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # rejections are counted in the table instead of logged one by one
+
+    security.settings.BCRYPT_ROUNDS = args.rounds
+    security.settings.BCRYPT_MIN_ROUNDS = min(args.rounds, security.settings.BCRYPT_MIN_ROUNDS)
+    security.configure_password_hashing()
+    hashed = security.hash_password(PASSWORD)
+
+    print(f"{'path':>7}{'logins':>8}{'logins/sec':>12}{'rejected 503':>14}{'p99 other ms':>14}")
+    for label, verify in (("inline", _inline), ("pool", security.verify_and_update_password_async)):
+        for concurrency in args.concurrency:
+            throughput, rejected, p99 = asyncio.run(_storm(verify, hashed, concurrency, args.seconds))
+            print(f"{label:>7}{concurrency:>8}{throughput:>12.1f}{rejected:>14}{p99:>14.1f}")
+    security.shutdown_hash_executor()
+
+
+if __name__ == "__main__":
+    main()
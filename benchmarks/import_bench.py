@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import csv
+import io
+import time
+
+from benchmarks.scratch import migrate, product_rows
+
+from sqlalchemy import delete, insert
+
+from app.core.database import SessionLocal
+from app.product.importer import import_products
+from app.product.models import Product
+
+FIELDS = ["name", "description", "price", "stock", "category", "image_url"]
+
+
+async def _csv_upload(rows: int, chunk_rows: int = 1000):
+    # generated as it is consumed, like a streamed upload: the file is never held in memory
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for batch in product_rows(rows):
+        for start in range(0, len(batch), chunk_rows):
+            writer.writerows(batch[start:start + chunk_rows])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.getvalue():
+        yield buffer.getvalue().encode()
+
+
+def _one_by_one(rows: int) -> float:
+    # the old path: one insert and one commit per product
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        for batch in product_rows(rows):
+            for row in batch:
+                session.execute(insert(Product), [row])
+                session.commit()
+    return rows / (time.perf_counter() - started)
+
+
+def _clear() -> None:
+    with SessionLocal() as session:
+        session.execute(delete(Product))
+        session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk CSV import throughput (rows/sec) vs one commit per product.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--baseline-rows", type=int, default=2000, help="rows for the one-by-one baseline")
+    args = parser.parse_args()
+
+    migrate()
+    baseline = _one_by_one(args.baseline_rows)
+    _clear()
+    print(f"{'rows':>10}{'seconds':>10}{'rows/sec':>12}{'one-by-one rows/sec':>22}")
+    for rows in args.rows:
+        started = time.perf_counter()
+        report = asyncio.run(import_products(_csv_upload(rows), "csv", created_by=1))
+        elapsed = time.perf_counter() - started
+        assert report["inserted"] == rows, report
+        print(f"{rows:>10}{elapsed:>10.1f}{rows / elapsed:>12.0f}{baseline:>22.0f}")
+        _clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.scratch import product_rows
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.auth.models import *  # noqa: F401,F403  (register every table the product FKs point at)
+from app.cart.models import Cart  # noqa: F401
+from app.orders.models import Order, OrderItem  # noqa: F401
+from app.core.pagination import encode_cursor
+from app.product import services
+from app.product.models import Product
+
+
+def _time_ms(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OFFSET and cursor latency for one deep /public/products page.")
+    parser.add_argument("--products", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for products in args.products:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            Base.metadata.create_all(engine)
+            session_factory = sessionmaker(bind=engine)
+            with session_factory() as session:
+                for rows in product_rows(products):
+                    session.execute(insert(Product), rows)
+                session.commit()
+
+                print(f"\n{products} products, page {args.page} (size {args.page_size})")
+                print(f"{'sort':<12}{'offset ms':>11}{'cursor ms':>11}")
+                skip = (args.page - 1) * args.page_size
+                for sort_by in (None, "price_asc", "price_desc", "name"):
+                    def page(cursor=None, skip=skip):
+                        return services._list_products(session, None, None, None, sort_by, skip, args.page_size, cursor)
+
+                    # the cursor a client holds after reading the previous page
+                    last = services._list_products(session, None, None, None, sort_by, skip - 1, 1, None)[0]
+                    cursor = encode_cursor(sort_by, services.product_sort_key(sort_by)(last), last.id)
+                    assert [p.id for p in page()] == [p.id for p in page(cursor, 0)]
+                    offset = _time_ms(page, args.repeats)
+                    keyset = _time_ms(lambda: page(cursor, 0), args.repeats)
+                    print(f"{sort_by or 'id':<12}{offset:>11.2f}{keyset:>11.2f}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
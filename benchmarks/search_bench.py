@@ -0,0 +1,54 @@
+import argparse
+import time
+
+from benchmarks.scratch import migrate, product_rows
+
+from sqlalchemy import insert, or_
+
+from app.core.database import SessionLocal
+from app.product import services
+from app.product.models import Product
+
+KEYWORDS = ["shirt", "leather sh", "blue cotton", "lamp 0001", "phone case"]
+
+
+def _like_search(session, keyword: str):
+    # the old path: substring scan over name and description, every match returned
+    return session.query(Product).filter(
+        or_(Product.name.ilike(f"%{keyword}%"), Product.description.ilike(f"%{keyword}%"))
+    ).all()
+
+
+def _time_ms(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ILIKE scan search with the FTS5 index (first page of 10).")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    migrate()
+    with SessionLocal() as session:
+        start = time.perf_counter()
+        for rows in product_rows(args.products):
+            session.execute(insert(Product), rows)  # FTS triggers index every row
+        session.commit()
+        print(f"{args.products} products seeded in {time.perf_counter() - start:.0f} s")
+
+        print(f"{'keyword':<14}{'like ms':>10}{'like rows':>11}{'fts ms':>10}")
+        for keyword in KEYWORDS:
+            like_rows = len(_like_search(session, keyword))
+            like = _time_ms(lambda: _like_search(session, keyword), args.repeats)
+            fts = _time_ms(lambda: services.search_products_service(session, keyword, 0, 10), args.repeats)
+            print(f"{keyword:<14}{like:>10.1f}{like_rows:>11}{fts:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.scratch import migrate, product_rows
+
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+from app.product.models import Product
+from app.product.suggest import CatalogSuggestions, np
+
+# a few distinctive names so typo matches have something to find among the synthetic ones
+RARE_NAMES = ["Ergonomic Standing Desk Converter", "Noise Cancelling Headphones", "Cast Iron Skillet"]
+QUERIES = {
+    "one letter": "r",
+    "word prefix": "re",
+    "two words": "leather sh",
+    "number prefix": "0001",
+    "typo": "ergonmic standng",
+    "typo, common": "lether",
+    "typo + number": "lamp 0001234x",
+}
+
+
+def _percentiles_ms(fn, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Typeahead index size and lookup latency (10 suggestions per query).")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+
+    migrate()
+    with SessionLocal() as session:
+        for rows in product_rows(args.products):
+            session.execute(insert(Product), rows)
+        session.execute(insert(Product), [{**rows[0], "name": name} for name in RARE_NAMES])
+        session.commit()
+
+        index = CatalogSuggestions()
+        start = time.perf_counter()
+        index.rebuild(session)
+        built = time.perf_counter() - start
+        # a second build under tracemalloc (which slows allocation down) for the memory figures
+        tracemalloc.start()
+        traced = CatalogSuggestions()
+        traced.rebuild(session)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{args.products} names indexed in {built:.1f} s (numpy {'on' if np is not None else 'off'}): "
+              f"{retained / 2**20:.0f} MB retained, {peak / 2**20:.0f} MB peak while building")
+
+        print(f"{'query':<16}{'text':<20}{'p50 ms':>9}{'p99 ms':>9}{'hits':>6}")
+        for label, query in QUERIES.items():
+            hits = len(index.suggest(session, query, 10))
+            p50, p99 = _percentiles_ms(lambda: index.suggest(session, query, 10), args.repeats)
+            print(f"{label:<16}{query:<20}{p50:>9.3f}{p99:>9.3f}{hits:>6}")
+
+
+if __name__ == "__main__":
+    main()
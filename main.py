@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request  # type: ignore
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -9,10 +12,55 @@ from app.cart.routes import cart_router
 from app.orders.routes import order_router
 from app.checkout.routes import checkout_router
 from app.core.logger import get_logger
+from app.auth.reaper import reap_expired_tokens
+from app.auth.services import rebuild_revoked_tokens
+from app.cart.store import cart_store, flush_carts
+from app.cart.sweeper import sweep_abandoned_carts
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.scheduler import run_periodically
+from app.core.security import configure_password_hashing, shutdown_hash_executor
+from app.core.settings import get_settings
+from app.product.facets import catalog_facets
+from app.product.suggest import catalog_suggestions
+from app.product.columnar import catalog_columns
 
 logger = get_logger("global")
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(configure_password_hashing)  # before the hash pool forks any workers
+    if settings.AUTH_TOKEN_MODE == "stateless":
+        async with AsyncSessionLocal() as session:
+            await rebuild_revoked_tokens(session)
+    await asyncio.to_thread(_build_catalog_indexes)
+    background_jobs = [
+        asyncio.create_task(run_periodically("token-reaper", settings.TOKEN_REAPER_INTERVAL_SECONDS, reap_expired_tokens)),
+        asyncio.create_task(run_periodically("cart-sweeper", settings.CART_SWEEPER_INTERVAL_SECONDS, sweep_abandoned_carts)),
+    ]
+    if cart_store.enabled:
+        background_jobs.append(
+            asyncio.create_task(run_periodically("cart-flush", settings.CART_FLUSH_INTERVAL_SECONDS, flush_carts))
+        )
+    yield
+    for job in background_jobs:
+        job.cancel()
+    await asyncio.gather(*background_jobs, return_exceptions=True)
+    if cart_store.enabled:
+        await flush_carts()  # last write-behind flush before the process exits
+    shutdown_hash_executor()
+
+
+def _build_catalog_indexes():
+    with SessionLocal() as session:
+        catalog_facets.rebuild(session)
+        catalog_suggestions.rebuild(session)
+        if catalog_columns.enabled:
+            catalog_columns.rebuild(session)
+
 
-app = FastAPI(debug=True)  # ✅ define only once here
+app = FastAPI(debug=True, lifespan=lifespan)  # ✅ define only once here
 
 # ✅ include routers here
 app.include_router(user_router)
@@ -36,6 +84,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": True, "message": exc.detail, "code": exc.status_code},
+        headers=getattr(exc, "headers", None),
     )
 
 @app.exception_handler(RequestValidationError)
@@ -0,0 +1,114 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+# settings are read at import time: point the app at a throwaway database before anything imports it
+_tmp_dir = tempfile.mkdtemp(prefix="ecommerce-tests-")
+os.environ["SQLITE_DB_FILE"] = os.path.join(_tmp_dir, "test.db")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("REAL_MAIL_FROM", "noreply@test.com")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+import pytest  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import event, insert, text  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABLES = ("cart", "order_items", "orders", "products", "category_closure", "categories", "user_tokens", "users")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    # the real schema (triggers, catalog_state row, FTS table) comes from the migrations
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    command.upgrade(config, "head")
+    yield
+
+
+@pytest.fixture
+def db(database):
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+    with SessionLocal() as cleanup:
+        for table in TABLES:
+            cleanup.execute(text(f"DELETE FROM {table}"))
+        cleanup.commit()
+
+
+@pytest.fixture
+def make_user(db):
+    from app.auth.models import User
+
+    def make(email: str = "shopper@test.com", role: str = "user") -> User:
+        user = User(name="Test", email=email, password="not-a-hash", role=role, is_active=True,
+                    verified_at=datetime.utcnow(), updated_at=datetime.utcnow())
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_products(db):
+    from app.product.models import Product
+
+    def make(count: int, category: str = "Test", price: float = 1.0):
+        rows = [{"name": f"Product {i}", "description": "", "price": price, "stock": 10, "category": category,
+                 "image_url": "https://example.com/p.jpg", "created_by": 1} for i in range(count)]
+        ids = db.execute(insert(Product).returning(Product.id), rows).scalars().all()
+        db.commit()
+        return list(ids)
+    return make
+
+
+@pytest.fixture
+def count_statements():
+    from app.core.database import engine
+
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    return counting
+
+
+@pytest.fixture
+def client_as(db):
+    from fastapi.testclient import TestClient
+    from app.core.security import admin_required, get_current_user, user_required
+    from main import app
+
+    def as_user(user):
+        # skip token lookup: these tests are about what the routes do once authenticated
+        for dependency in (get_current_user, user_required, admin_required):
+            app.dependency_overrides[dependency] = lambda: user
+        return TestClient(app)  # no context manager: the lifespan (bcrypt calibration, jobs) isn't needed
+    yield as_user
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def memory_cart_store(monkeypatch):
+    # a fresh write-behind store per test: user ids are reused once the tables are cleaned
+    from app.cart import routes, services, store, sweeper
+    from app.checkout import services as checkout_services
+
+    fresh = store.WriteBehindCartStore()
+    monkeypatch.setattr(store.settings, "CART_STORE", "memory")
+    for module in (store, services, routes, sweeper, checkout_services):
+        monkeypatch.setattr(module, "cart_store", fresh)
+    return fresh
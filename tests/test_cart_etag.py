@@ -0,0 +1,44 @@
+from app.cart import services
+from app.cart.schemas import CartCreate
+
+
+def test_swapping_a_line_changes_the_cart_state(db, make_user, make_products):
+    user = make_user()
+    first, second, third = make_products(3)
+    services.add_to_cart(db, user.id, CartCreate(product_id=first, quantity=1))
+    services.add_to_cart(db, user.id, CartCreate(product_id=second, quantity=1))
+    before = services.get_cart_state(db, user.id)
+
+    # the new line reuses the freed rowid, so count/max(id)/sum(version) would all match
+    services.remove_cart_item(db, user.id, second)
+    services.add_to_cart(db, user.id, CartCreate(product_id=third, quantity=1))
+
+    assert services.get_cart_state(db, user.id) != before
+
+
+def test_unchanged_cart_answers_304_with_one_statement(db, make_user, make_products, client_as, count_statements):
+    user = make_user()
+    for product_id in make_products(5):
+        services.add_to_cart(db, user.id, CartCreate(product_id=product_id, quantity=2))
+    client = client_as(user)
+
+    first = client.get("/cart/")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    with count_statements() as statements:
+        response = client.get("/cart/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(statements) == 1  # the cart state query only: no page, totals or product reads
+
+
+def test_cart_change_invalidates_etag(db, make_user, make_products, client_as):
+    user = make_user()
+    first, second = make_products(2)
+    services.add_to_cart(db, user.id, CartCreate(product_id=first, quantity=1))
+    client = client_as(user)
+    etag = client.get("/cart/").headers["ETag"]
+
+    services.add_to_cart(db, user.id, CartCreate(product_id=second, quantity=1))
+
+    assert client.get("/cart/", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+
+from app.cart import services
+from app.cart.models import Cart
+from app.cart.schemas import CartCreate
+from app.checkout.services import perform_checkout
+
+
+def test_memory_cursor_survives_removing_an_earlier_line(db, make_user, make_products, memory_cart_store, client_as):
+    user = make_user()
+    product_ids = make_products(6)
+    for product_id in product_ids:
+        services.add_to_cart(db, user.id, CartCreate(product_id=product_id, quantity=1))
+    db.refresh(user)
+    client = client_as(user)
+
+    first = client.get("/cart/", params={"limit": 3})
+    assert [item["product_id"] for item in first.json()["items"]] == product_ids[:3]
+
+    services.remove_cart_item(db, user.id, product_ids[0])
+    second = client.get("/cart/", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+
+    assert [item["product_id"] for item in second.json()["items"]] == product_ids[3:]
+
+
+def test_checkout_holds_the_memory_cart_until_the_order_commits(db, make_user, make_products, memory_cart_store):
+    user = make_user()
+    bought, later = make_products(2)
+    services.add_to_cart(db, user.id, CartCreate(product_id=bought, quantity=2))
+
+    with memory_cart_store.checking_out(user.id):
+        # the cart is flushed and edits are refused until the order is placed
+        assert db.query(Cart.product_id).filter(Cart.user_id == user.id).all() == [(bought,)]
+        with pytest.raises(HTTPException) as refused:
+            services.add_to_cart(db, user.id, CartCreate(product_id=later, quantity=1))
+        assert refused.value.status_code == 409
+
+    perform_checkout(db, user)
+    services.add_to_cart(db, user.id, CartCreate(product_id=later, quantity=1))
+    memory_cart_store.flush()
+
+    # the purchased line is not flushed back into the cart
+    assert db.query(Cart.product_id).filter(Cart.user_id == user.id).all() == [(later,)]
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.cart import services
+from app.cart.models import Cart
+from app.cart.schemas import CartCreate, CartUpdate
+from app.cart.sweeper import settings, sweep_abandoned_carts
+
+
+def _age_lines(db, user_id: int, days: int) -> None:
+    db.execute(update(Cart).where(Cart.user_id == user_id).values(updated_at=datetime.utcnow() - timedelta(days=days)))
+    db.commit()
+
+
+def test_sweeper_is_off_by_default(db, make_user, make_products):
+    user = make_user()
+    services.add_to_cart(db, user.id, CartCreate(product_id=make_products(1)[0], quantity=1))
+    _age_lines(db, user.id, 365)
+
+    assert settings.CART_TTL_DAYS == 0
+    asyncio.run(sweep_abandoned_carts())
+
+    assert db.query(Cart).count() == 1
+
+
+def test_swept_lines_are_not_flushed_back_from_a_dirty_memory_cart(
+        db, make_user, make_products, memory_cart_store, monkeypatch):
+    monkeypatch.setattr(settings, "CART_TTL_DAYS", 30)
+    user = make_user()
+    abandoned, edited = make_products(2)
+    services.add_to_cart(db, user.id, CartCreate(product_id=abandoned, quantity=1))
+    services.add_to_cart(db, user.id, CartCreate(product_id=edited, quantity=1))
+    memory_cart_store.flush()
+    _age_lines(db, user.id, 40)
+
+    # edited in memory only: the table row still looks abandoned when the sweeper runs
+    services.update_cart_quantity(db, user.id, edited, CartUpdate(quantity=3))
+    asyncio.run(sweep_abandoned_carts())
+    memory_cart_store.flush()
+
+    db.expire_all()
+    assert db.query(Cart.product_id, Cart.quantity).filter(Cart.user_id == user.id).all() == [(edited, 3)]
+
+
+def test_a_flush_cannot_run_between_a_sweep_batch_and_expire(
+        db, make_user, make_products, memory_cart_store, monkeypatch):
+    monkeypatch.setattr(settings, "CART_TTL_DAYS", 30)
+    user = make_user()
+    abandoned, edited = make_products(2)
+    services.add_to_cart(db, user.id, CartCreate(product_id=abandoned, quantity=1))
+    services.add_to_cart(db, user.id, CartCreate(product_id=edited, quantity=1))
+    memory_cart_store.flush()
+    _age_lines(db, user.id, 40)
+    services.update_cart_quantity(db, user.id, edited, CartUpdate(quantity=3))
+
+    expire = memory_cart_store.expire
+    flushes = []
+
+    def expire_after_a_flush_tick(swept):
+        # a flush timer firing right after the batch committed
+        flush = threading.Thread(target=memory_cart_store.flush)
+        flush.start()
+        flush.join(0.2)
+        flushes.append(flush)
+        expire(swept)
+
+    monkeypatch.setattr(memory_cart_store, "expire", expire_after_a_flush_tick)
+    asyncio.run(sweep_abandoned_carts())
+    for flush in flushes:
+        flush.join()
+    memory_cart_store.flush()
+
+    db.expire_all()
+    assert db.query(Cart.product_id, Cart.quantity).filter(Cart.user_id == user.id).all() == [(edited, 3)]
@@ -0,0 +1,49 @@
+from app.cart import services
+from app.cart.schemas import CartCreate
+
+MAX_STATEMENTS = 3  # cart state (ETag) + page with totals + totals again only past the end
+
+
+def _fill_cart(db, user, make_products, lines: int = 50):
+    for product_id in make_products(lines, price=2.5):
+        services.add_to_cart(db, user.id, CartCreate(product_id=product_id, quantity=2))
+    db.refresh(user)  # the commits expired it; don't count its reload against the route
+
+
+def test_cart_pages_use_a_constant_number_of_statements(db, make_user, make_products, client_as, count_statements):
+    user = make_user()
+    _fill_cart(db, user, make_products)
+    client = client_as(user)
+
+    with count_statements() as statements:
+        response = client.get("/cart/", params={"limit": 20})
+    assert response.status_code == 200
+    assert len(statements) <= MAX_STATEMENTS
+    body = response.json()
+    assert len(body["items"]) == 20
+    assert (body["line_count"], body["item_count"], body["grand_total"]) == (50, 100, 250.0)
+
+    seen = [item["product_id"] for item in body["items"]]
+    cursor = response.headers["X-Next-Cursor"]
+    while cursor:
+        with count_statements() as statements:
+            response = client.get("/cart/", params={"limit": 20, "cursor": cursor})
+        assert len(statements) <= MAX_STATEMENTS
+        seen += [item["product_id"] for item in response.json()["items"]]
+        cursor = response.headers.get("X-Next-Cursor")
+    assert len(seen) == len(set(seen)) == 50
+
+
+def test_past_the_end_page_keeps_totals_with_a_constant_number_of_statements(
+        db, make_user, make_products, client_as, count_statements):
+    user = make_user()
+    _fill_cart(db, user, make_products)
+    client = client_as(user)
+
+    with count_statements() as statements:
+        response = client.get("/cart/", params={"skip": 60, "limit": 20})
+    assert response.status_code == 200
+    assert len(statements) <= MAX_STATEMENTS
+    body = response.json()
+    assert body["items"] == []
+    assert (body["line_count"], body["item_count"], body["grand_total"]) == (50, 100, 250.0)
@@ -0,0 +1,61 @@
+import json
+import tracemalloc
+
+from sqlalchemy import insert, text
+
+from app.core.database import engine
+from app.core.export import encode_records
+from app.orders import services as order_services
+from app.orders.models import Order, OrderItem
+from app.product import services as product_services
+from app.product.models import Product
+
+
+def _add_products(db, count: int) -> None:
+    db.execute(insert(Product), [{
+        "name": f"Product {i}", "description": "x" * 200, "price": 1.0 + i, "stock": 10, "category": "Export",
+        "image_url": "https://example.com/p.jpg", "created_by": 1,
+    } for i in range(count)])
+    db.commit()
+
+
+def _peak_bytes(records, fieldnames) -> int:
+    tracemalloc.start()
+    try:
+        for _ in encode_records(records, "ndjson", fieldnames):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_product_export_memory_stays_flat(db, monkeypatch):
+    monkeypatch.setattr(product_services.settings, "EXPORT_BATCH_SIZE", 200)
+    _add_products(db, 2000)
+    small = _peak_bytes(product_services.iter_products_for_export(), product_services.PRODUCT_EXPORT_FIELDS)
+    _add_products(db, 18000)
+    large = _peak_bytes(product_services.iter_products_for_export(), product_services.PRODUCT_EXPORT_FIELDS)
+
+    # 10x the rows must not mean 10x the memory: only one chunk is held at a time
+    assert large < small * 2
+
+
+def test_order_export_keeps_orders_whole_across_chunks(db, make_user, monkeypatch):
+    monkeypatch.setattr(order_services.settings, "EXPORT_BATCH_SIZE", 3)
+    user = make_user()
+    order_ids = db.execute(insert(Order).returning(Order.id),
+                           [{"user_id": user.id, "total_amount": 2.0} for _ in range(7)]).scalars().all()
+    db.execute(insert(OrderItem), [{"order_id": order_id, "quantity": 1, "price_at_purchase": 1.0, "product_name": "p"}
+                                   for order_id in order_ids for _ in range(2)])
+    db.commit()
+
+    nested = list(order_services.iter_orders_for_export())
+    assert [order["id"] for order in nested] == order_ids
+    assert all(len(order["items"]) == 2 for order in nested)
+    assert len(list(order_services.iter_orders_for_export(nested=False))) == 14
+    json.dumps(nested, default=str)
+
+
+def test_engines_use_wal():
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
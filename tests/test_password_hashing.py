@@ -0,0 +1,49 @@
+import logging
+
+import pytest
+from passlib.hash import bcrypt
+
+from app.core import security
+
+
+@pytest.fixture(autouse=True)
+def restore_hashing(monkeypatch):
+    # configure_password_hashing mutates the shared context and settings: give them back to later tests
+    for name in ("BCRYPT_ROUNDS", "BCRYPT_TARGET_MS", "BCRYPT_MIN_ROUNDS", "BCRYPT_MAX_ROUNDS"):
+        monkeypatch.setattr(security.settings, name, getattr(security.settings, name))
+    saved = security.pwd_context.to_dict()
+    yield
+    security.pwd_context.load(saved)
+
+
+def _hash_at(rounds: int) -> str:
+    # rewrite the cost field of a cheap hash: needs_update only parses the hash
+    return bcrypt.using(rounds=4).hash("Secret#123").replace("$04$", f"${rounds:02d}$", 1)
+
+
+def test_only_hashes_weaker_than_this_hosts_cost_are_rehashed(monkeypatch):
+    monkeypatch.setattr(security.settings, "BCRYPT_ROUNDS", 13)
+    security.configure_password_hashing()
+
+    assert security.pwd_context.needs_update(_hash_at(12))
+    # hashes from a host that calibrated higher are left alone
+    assert not security.pwd_context.needs_update(_hash_at(13))
+    assert not security.pwd_context.needs_update(_hash_at(14))
+
+
+def test_configured_rounds_never_go_below_the_floor(monkeypatch):
+    monkeypatch.setattr(security.settings, "BCRYPT_ROUNDS", 8)
+    monkeypatch.setattr(security.settings, "BCRYPT_MIN_ROUNDS", 10)
+    security.configure_password_hashing()
+
+    assert security.pwd_context.to_dict()["bcrypt__default_rounds"] == 10
+
+
+def test_calibration_can_pick_a_cost_below_the_recommended_one(monkeypatch, caplog):
+    monkeypatch.setattr(security, "calibrate_rounds", lambda target_ms, low, high: low)
+    monkeypatch.setattr(security.settings, "BCRYPT_ROUNDS", 0)
+    with caplog.at_level(logging.WARNING):
+        security.configure_password_hashing()
+
+    assert security.pwd_context.to_dict()["bcrypt__default_rounds"] == security.settings.BCRYPT_MIN_ROUNDS == 10
+    assert "below the recommended 12" in caplog.text
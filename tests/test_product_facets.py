@@ -0,0 +1,27 @@
+from sqlalchemy import update
+
+from app.product.cache import catalog_cache
+from app.product.categories import create_category
+from app.product.models import Product
+
+
+def test_facets_take_the_same_taxonomy_filters_as_the_listing(db, make_products, client_as):
+    footwear = create_category(db, "Footwear", None)
+    boots = create_category(db, "Boots", footwear.id)
+    lamps = create_category(db, "Lamps", None)
+    for category, count, price in ((boots, 3, 40.0), (footwear, 1, 120.0), (lamps, 2, 15.0)):
+        ids = make_products(count, category=category.name, price=price)
+        db.execute(update(Product).where(Product.id.in_(ids)).values(category_id=category.id))
+    db.commit()
+    client = client_as(None)
+    catalog_cache.invalidate()
+
+    for params in ({"category_slug": " FOOTWEAR "}, {"category_id": footwear.id}, {"category_id": boots.id}):
+        facets = client.get("/public/products/facets", params=params).json()
+        listing = client.get("/public/products", params={**params, "page_size": 100}).json()
+        assert facets["total"] == len(listing)
+        assert sum(bucket["count"] for bucket in facets["price_histogram"]) == len(listing)
+
+    facets = client.get("/public/products/facets", params={"category_slug": "footwear"}).json()
+    assert facets["categories"] == [{"category": "Boots", "count": 3}, {"category": "Footwear", "count": 1}]
+    assert client.get("/public/products/facets", params={"category_slug": "nope"}).json()["total"] == 0
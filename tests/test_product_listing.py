@@ -0,0 +1,108 @@
+import threading
+
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.product import services
+from app.product.cache import catalog_cache, catalog_flights
+from app.product.models import Product
+from app.product.schemas import Product as ProductOut
+
+
+def test_category_is_normalized_before_cache_key_and_query(db, make_products, client_as):
+    make_products(2, category="Electronics")
+    make_products(1, category="Books")
+    client = client_as(None)
+
+    catalog_cache.invalidate()
+    plain = client.get("/public/products", params={"category": "elec"})
+    catalog_cache.invalidate()  # answered by the query again, not by the cached entry of the first call
+    padded = client.get("/public/products", params={"category": "  ELEC "})
+
+    assert len(plain.json()) == 2
+    assert padded.json() == plain.json()
+    assert padded.headers["ETag"] == plain.headers["ETag"]
+    # a blank filter is no filter
+    assert len(client.get("/public/products", params={"category": "  "}).json()) == 3
+
+
+def test_coalesced_followers_get_detached_response_models(db, make_products, monkeypatch):
+    make_products(3, category="Garden")
+    release = threading.Event()
+    list_products = services._list_products
+
+    def slow_list(*args, **kwargs):
+        release.wait(5)
+        return list_products(*args, **kwargs)
+
+    monkeypatch.setattr(services, "_list_products", slow_list)
+    results = {}
+
+    def request(name):
+        with SessionLocal() as session:  # closed as soon as this "request" returns, like get_session
+            results[name] = services.list_products_service(session, "garden", None, None, None)
+
+    coalesced = catalog_flights.coalesced
+    leader = threading.Thread(target=request, args=("leader",))
+    leader.start()
+    while not catalog_flights.stats()["in_flight"]:
+        pass
+    follower = threading.Thread(target=request, args=("follower",))
+    follower.start()
+    while catalog_flights.coalesced == coalesced:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert all(isinstance(product, ProductOut) for product in results["follower"])
+    assert [p.name for p in results["follower"]] == [p.name for p in results["leader"]] == [f"Product {i}" for i in range(3)]
+
+
+def test_requests_after_a_write_do_not_join_a_pre_write_query(db, make_products, monkeypatch):
+    product_id = make_products(1, category="Garden")[0]
+    queried = threading.Event()
+    release = threading.Event()
+    list_products = services._list_products
+
+    def slow_list(*args, **kwargs):
+        products = list_products(*args, **kwargs)
+        if not queried.is_set():  # only the first (pre-write) query is held back
+            queried.set()
+            release.wait(5)
+        return products
+
+    monkeypatch.setattr(services, "_list_products", slow_list)
+    results = {}
+
+    def request(name):
+        with SessionLocal() as session:
+            results[name] = services.list_products_service(session, "garden", None, None, None)
+
+    leader = threading.Thread(target=request, args=("before",))
+    leader.start()
+    queried.wait(5)
+    db.execute(update(Product).where(Product.id == product_id).values(name="Renamed"))
+    db.commit()  # catalog_state trigger bumps the version
+    request("after")
+    release.set()
+    leader.join()
+
+    assert [p.name for p in results["before"]] == ["Product 0"]
+    assert [p.name for p in results["after"]] == ["Renamed"]
+
+
+def test_cache_hits_notice_writes_made_by_another_worker(db, make_products, client_as, count_statements):
+    product_id = make_products(1, category="Garden")[0]
+    client = client_as(None)
+    catalog_cache.invalidate()
+    assert client.get("/public/products").json()[0]["name"] == "Product 0"
+
+    # another worker's write: catalog_state moves, this process's cache version doesn't
+    db.execute(update(Product).where(Product.id == product_id).values(name="Renamed"))
+    db.commit()
+
+    assert client.get("/public/products").json()[0]["name"] == "Renamed"
+    with count_statements() as statements:
+        assert client.get("/public/products").json()[0]["name"] == "Renamed"
+    assert len(statements) == 1  # a fresh hit costs only the catalog_state read
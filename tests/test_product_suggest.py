@@ -0,0 +1,43 @@
+from sqlalchemy import delete, update
+
+from app.product.models import Product
+from app.product.suggest import CatalogSuggestions
+
+
+def _texts(suggestions):
+    return [(s["text"], s["match"]) for s in suggestions]
+
+
+def test_word_prefixes_and_typos_are_suggested(db, make_products):
+    first, second = make_products(2, category="Running Gear")
+    db.execute(update(Product).where(Product.id == first).values(name="Red Running Shoes"))
+    db.execute(update(Product).where(Product.id == second).values(name="Blue Sandals"))
+    db.commit()
+    index = CatalogSuggestions()
+
+    assert _texts(index.suggest(db, "runn", 5)) == [("Running Gear", "prefix"), ("Red Running Shoes", "prefix")]
+    assert _texts(index.suggest(db, "SHO", 5)) == [("Red Running Shoes", "prefix")]
+    assert _texts(index.suggest(db, "sandls", 5)) == [("Blue Sandals", "fuzzy")]
+    assert index.suggest(db, "  ", 5) == []
+
+
+def test_writes_are_applied_without_a_rebuild(db, make_products):
+    product_id = make_products(1, category="Lamps")[0]
+    index = CatalogSuggestions()
+    index.rebuild(db)
+
+    db.execute(update(Product).where(Product.id == product_id).values(name="Desk Lamp"))
+    db.commit()
+    index.apply(db, removed=("Product 0", "Lamps"), added=("Desk Lamp", "Lamps"))
+    assert _texts(index.suggest(db, "lamp", 5)) == [("Desk Lamp", "prefix"), ("Lamps", "prefix")]
+    assert index.suggest(db, "product", 5) == []
+
+    db.execute(delete(Product))
+    db.commit()
+    index.apply(db, removed=("Desk Lamp", "Lamps"))
+    assert index.suggest(db, "lamp", 5) == []
+
+    make_products(1, category="Lamps")  # a dead term comes back
+    index.apply(db, added=("Product 0", "Lamps"))
+    assert _texts(index.suggest(db, "la", 5)) == [("Lamps", "prefix")]
+    assert index.version >= 0
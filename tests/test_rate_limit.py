@@ -0,0 +1,36 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core import rate_limit
+from app.core.rate_limit import InMemoryTokenBucket, RateLimiter
+
+
+def test_zero_per_minute_disables_the_limit(monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limit_backend", InMemoryTokenBucket(100))
+    limiter = RateLimiter("login")
+    for _ in range(10):
+        limiter._check("login:ip:1.2.3.4", 0, 1)
+
+
+def test_empty_bucket_answers_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limit_backend", InMemoryTokenBucket(100))
+    limiter = RateLimiter("login")
+    limiter._check("login:ip:1.2.3.4", 6, 1)
+    with pytest.raises(HTTPException) as throttled:
+        limiter._check("login:ip:1.2.3.4", 6, 1)
+    assert throttled.value.status_code == 429
+    assert int(throttled.value.headers["Retry-After"]) >= 1
+
+
+def test_only_credential_endpoints_share_the_ip_bucket(db, client_as, monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limit_backend", InMemoryTokenBucket(100))
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_IP_PER_MINUTE", 1)
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_IP_BURST", 2)
+    client = client_as(None)
+
+    # a shared NAT refreshing access tokens doesn't use up the login budget
+    for _ in range(5):
+        assert client.post("/auth/refresh", headers={"refresh-token": "not-a-token"}).status_code != 429
+    login = {"username": "nobody@test.com", "password": "wrong"}
+    assert [client.post("/auth/login", data=login).status_code == 429 for _ in range(3)] == [False, False, True]
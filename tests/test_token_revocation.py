@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.auth.models import UserToken
+from app.core import security
+from app.core.revocation import RevokedTokens
+from app.core.token_cache import TokenCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_revocation_state(monkeypatch):
+    # token ids are reused once the tables are cleaned, so each test gets its own denylist and cache
+    monkeypatch.setattr(security, "revoked_tokens", RevokedTokens(60))
+    monkeypatch.setattr(security, "token_cache", TokenCache(100, 300))
+
+
+def _login(db, user) -> UserToken:
+    user_token = UserToken(user_id=user.id, access_key="a" * 50, refresh_key="r" * 100,
+                           expires_at=datetime.utcnow() + timedelta(days=1))
+    db.add(user_token)
+    db.commit()
+    security.token_cache.set(user_token.id, user_token.access_key, user, user_token.expires_at)
+    return user_token
+
+
+def test_deactivating_a_user_revokes_their_tokens(db, make_user):
+    user = make_user()
+    user_token = _login(db, user)
+
+    user.is_active = False
+    db.commit()
+
+    assert security.revoked_tokens.is_revoked(user_token.id)  # stateless mode
+    assert security.token_cache.get(user_token.id, user_token.access_key) is None  # cached db mode
+    db.refresh(user_token)
+    assert user_token.expires_at <= datetime.utcnow()  # db mode and the rebuilt denylist after a restart
+
+
+def test_role_change_revokes_their_tokens(db, make_user):
+    user = make_user()
+    user_token = _login(db, user)
+
+    user.role = "admin"
+    db.commit()
+
+    assert security.revoked_tokens.is_revoked(user_token.id)
+
+
+def test_other_profile_changes_keep_tokens(db, make_user):
+    user = make_user()
+    user_token = _login(db, user)
+
+    user.name = "Renamed"
+    db.commit()
+
+    assert not security.revoked_tokens.is_revoked(user_token.id)
+    assert security.token_cache.get(user_token.id, user_token.access_key) is not None